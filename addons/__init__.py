@@ -1,3 +1,6 @@
+from .autocomplete import SearchAutocomplete
+from .buffer import WriteBuffer, PartialWrite
+from .cache import DocumentCache
 from .lyrics import LYRICS_PLATFORMS
 from .placeholders import Placeholders
 from .settings import Settings
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""MIT License
+
+Copyright (c) 2023 - present Vocard Development
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+
+from voicelink.utils import TTLCache
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+SearchResult = List[Tuple[str, str]]
+
+class SearchAutocomplete:
+    """Serves search autocomplete with a single in-flight lookup per user.
+
+       Every keystroke cancels the user's previous lookup, and a new lookup only
+       starts searching once the user has paused for `debounce` seconds. Results
+       are cached by query, and when a lookup misses the `deadline` the results of
+       the longest cached prefix are returned instead, while the lookup keeps
+       running in the background to warm the cache for the next keystroke.
+    """
+
+    def __init__(
+        self,
+        *,
+        debounce: float = 0.3,
+        deadline: float = 2.5,
+        min_prefix: int = 3,
+        cache_size: int = 1024,
+        cache_ttl: float = 300
+    ) -> None:
+        self._debounce: float = debounce
+        self._deadline: float = deadline
+        self._min_prefix: int = min_prefix
+        self._pending: Dict[int, asyncio.Task] = {}
+        self._results: TTLCache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {**self._results.stats, "pending": len(self._pending)}
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def _cached_prefix(self, key: str) -> Optional[str]:
+        # Prefixes are probed with peek, so only the final lookup shows up in the stats.
+        for end in range(len(key), self._min_prefix - 1, -1):
+            if self._results.peek(key[:end]) is not None:
+                return key[:end]
+        return None
+
+    async def _lookup(self, key: str, fetch: Callable[[], Awaitable[SearchResult]]) -> SearchResult:
+        await asyncio.sleep(self._debounce)
+        return self._results.put(key, await fetch())
+
+    def _done(self, user_id: int, task: asyncio.Task) -> None:
+        if self._pending.get(user_id) is task:
+            del self._pending[user_id]
+
+        if not task.cancelled():
+            task.exception()
+
+    async def search(self, user_id: int, query: str, fetch: Callable[[], Awaitable[SearchResult]]) -> SearchResult:
+        """Returns (author, title) results for the query typed by the user, using fetch on a cache miss."""
+        key = self.normalize(query)
+        if (results := self._results.get(key)) is not None:
+            return results
+
+        if (previous := self._pending.pop(user_id, None)) is not None:
+            previous.cancel()
+
+        task = asyncio.ensure_future(self._lookup(key, fetch))
+        task.add_done_callback(lambda t: self._done(user_id, t))
+        self._pending[user_id] = task
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout=self._deadline)
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+        except Exception:
+            pass
+
+        # Superseded by a newer keystroke, failed or too slow for the interaction deadline.
+        # The lookup of the key was already counted as a miss above.
+        prefix = self._cached_prefix(key)
+        return self._results.peek(prefix) if prefix is not None else []
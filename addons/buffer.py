@@ -0,0 +1,252 @@
+"""MIT License
+
+Copyright (c) 2023 - present Vocard Development
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+import logging
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+MERGEABLE_OPERATORS = ("$set", "$inc", "$push")
+
+def _overlaps(path: str, other: str) -> bool:
+    return path.startswith(other + ".") or other.startswith(path + ".")
+
+def _normalize_push(value: Any) -> Any:
+    if isinstance(value, dict) and "$each" in value:
+        if not set(value) <= {"$each", "$slice"}:
+            return value
+        push = {"$each": list(value["$each"])}
+        if "$slice" in value:
+            push["$slice"] = value["$slice"]
+        return push
+    return {"$each": [value]}
+
+class PartialWrite(Exception):
+    """Raised by a writer when only the first `written` operations of a batch were written."""
+
+    def __init__(self, written: int) -> None:
+        super().__init__(f"Only {written} operations were written.")
+        self.written: int = written
+
+def _can_merge_push(push: Any, other: Any) -> bool:
+    return (
+        set(push) <= {"$each", "$slice"} and set(other) <= {"$each", "$slice"}
+        and push.get("$slice") == other.get("$slice")
+    )
+
+class WriteBuffer:
+    """Coalesces database updates per key and hands them to `writer` in batches (write-behind).
+
+       Updates queued for the same key are merged into one update document while
+       their paths don't collide: `$set` keeps the last value, `$inc` adds up and
+       `$push` joins `$each` lists which share the same `$slice`. An update which
+       can't be merged starts a new document for the key, so the write order of a
+       key is kept. Pending updates are written `interval` seconds after the first
+       one was queued, or as soon as `max_pending` update documents are waiting.
+       A batch which fails to be written is queued again in front of newer updates,
+       until the key has failed `max_retries` times in a row.
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[List[Tuple[Hashable, Dict[str, Dict[str, Any]]]]], Awaitable[Any]],
+        *,
+        interval: float = 5.0,
+        max_pending: int = 500,
+        max_retries: int = 3,
+        logger: Optional[logging.Logger] = None
+    ) -> None:
+        self._writer = writer
+        self._pending: Dict[Hashable, List[Dict[str, Dict[str, Any]]]] = {}
+        self._pending_count: int = 0
+        self._interval: float = interval
+        self._max_pending: int = max_pending
+        self._max_retries: int = max_retries
+        self._retries: Dict[Hashable, int] = {}
+        self._writing: Set[Hashable] = set()
+        self._draining: bool = False
+        self._logger: Optional[logging.Logger] = logger
+
+        self._lock: Optional[asyncio.Lock] = None
+        self._timer_task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self.queued: int = 0
+        self.merged: int = 0
+        self.flushes: int = 0
+        self.writes: int = 0
+        self.errors: int = 0
+        self.dropped: int = 0
+
+    def __len__(self) -> int:
+        return self._pending_count
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether the key has updates which are queued or still being written."""
+        return key in self._pending or key in self._writing
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self._pending_count,
+            "queued": self.queued,
+            "merged": self.merged,
+            "flushes": self.flushes,
+            "writes": self.writes,
+            "errors": self.errors,
+            "dropped": self.dropped
+        }
+
+    def _merge(self, document: Dict[str, Dict[str, Any]], update: Dict[str, Dict[str, Any]]) -> bool:
+        for operator, fields in update.items():
+            for path, value in fields.items():
+                for other_operator, other_fields in document.items():
+                    for other_path, other_value in other_fields.items():
+                        if other_path == path:
+                            if other_operator != operator:
+                                return False
+                            if operator == "$push" and not _can_merge_push(value, other_value):
+                                return False
+                        elif _overlaps(path, other_path):
+                            return False
+
+        for operator, fields in update.items():
+            target = document.setdefault(operator, {})
+            for path, value in fields.items():
+                if path not in target:
+                    target[path] = value
+                elif operator == "$set":
+                    target[path] = value
+                elif operator == "$inc":
+                    target[path] += value
+                else:
+                    push = target[path]
+                    push["$each"].extend(value["$each"])
+                    # A negative slice keeps the tail, so older items can be dropped already.
+                    if (slice := push.get("$slice")) is not None and slice <= 0:
+                        del push["$each"][:max(0, len(push["$each"]) + slice)]
+        return True
+
+    def add(self, key: Hashable, update: Dict[str, Dict[str, Any]]) -> None:
+        """Queues an update document for the key. Only `$set`, `$inc` and `$push` can be buffered."""
+        for operator in update:
+            if operator not in MERGEABLE_OPERATORS:
+                raise ValueError(f"The {operator} operator can't be buffered.")
+
+        update = {
+            operator: {path: _normalize_push(value) for path, value in fields.items()} if operator == "$push" else dict(fields)
+            for operator, fields in update.items()
+        }
+
+        self.queued += 1
+        documents = self._pending.setdefault(key, [])
+        if documents and self._merge(documents[-1], update):
+            self.merged += 1
+        else:
+            documents.append(update)
+            self._pending_count += 1
+
+        if self._pending_count >= self._max_pending and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+        # The timer also picks up whatever a size-triggered flush leaves behind.
+        self._schedule_timer()
+
+    def _schedule_timer(self) -> None:
+        if self._pending and not self._draining and (self._timer_task is None or self._timer_task.done()):
+            self._timer_task = asyncio.get_running_loop().create_task(self._run_timer())
+
+    async def _run_timer(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self._interval)
+            await asyncio.shield(self.flush())
+        self._timer_task = None
+
+    async def flush(self) -> int:
+        """Writes every pending update and returns how many update documents were written."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if not self._pending:
+                return 0
+
+            pending, self._pending, self._pending_count = self._pending, {}, 0
+            operations = [(key, document) for key, documents in pending.items() for document in documents]
+            self._writing = set(pending)
+            try:
+                await self._writer(operations)
+                written = len(operations)
+            except Exception as e:
+                self.errors += 1
+                written = e.written if isinstance(e, PartialWrite) else 0
+                if self._logger:
+                    self._logger.error(f"Failed to write {len(operations) - written} of {len(operations)} buffered updates.", exc_info=e)
+                self._requeue(operations[written:])
+            finally:
+                self._writing = set()
+
+            for key, _ in operations[:written]:
+                self._retries.pop(key, None)
+
+            self.flushes += 1
+            self.writes += written
+            return written
+
+    def _requeue(self, operations: List[Tuple[Hashable, Dict[str, Dict[str, Any]]]]) -> None:
+        failed: Dict[Hashable, List[Dict[str, Dict[str, Any]]]] = {}
+        for key, document in operations:
+            failed.setdefault(key, []).append(document)
+
+        for key, documents in failed.items():
+            retries = self._retries[key] = self._retries.get(key, 0) + 1
+            if retries > self._max_retries:
+                del self._retries[key]
+                self.dropped += len(documents)
+                if self._logger:
+                    self._logger.error(f"Dropped {len(documents)} buffered updates of {key} after {self._max_retries} retries: {documents}")
+                continue
+
+            # Failed updates go in front of the ones queued meanwhile, keeping the write order.
+            self._pending[key] = documents + self._pending.get(key, [])
+            self._pending_count += len(documents)
+
+        self._schedule_timer()
+
+    async def drain(self) -> int:
+        """Stops the timer, writes everything which is still pending and returns how many updates had to be dropped."""
+        if self._timer_task is not None:
+            self._timer_task.cancel()
+            self._timer_task = None
+
+        dropped, self._draining = self.dropped, True
+        try:
+            while self._pending:
+                await self.flush()
+        finally:
+            self._draining = False
+
+        if dropped := self.dropped - dropped:
+            if self._logger:
+                self._logger.error(f"{dropped} buffered updates could not be written while draining.")
+        return dropped
@@ -0,0 +1,151 @@
+"""MIT License
+
+Copyright (c) 2023 - present Vocard Development
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+import time
+
+from voicelink.utils import LRUCache
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from .buffer import WriteBuffer
+
+# How often a load is repeated when buffered writes for the key keep arriving while it runs.
+LOAD_ATTEMPTS = 3
+
+class DocumentCache(LRUCache):
+    """A size-bounded LRU cache of database documents with a per-entry TTL.
+
+       Documents are cached as the same dict for their whole lifetime, so updates
+       applied to them in place stay visible to every holder. Once a document is
+       older than `ttl` it is still served for up to `stale_ttl` more seconds while
+       a single background load refreshes it in place (stale-while-revalidate).
+       Concurrent misses for the same key share one load.
+
+       When the cached documents are updated in place ahead of a `writes` buffer,
+       a load first waits until the key's buffered updates are in the database,
+       so a refresh can't overwrite them with an older copy.
+    """
+
+    __slots__ = ("_loader", "_loading", "_ttl", "_stale_ttl", "_writes", "stale_hits", "refreshes")
+
+    def __init__(
+        self,
+        loader: Callable[[Hashable], Awaitable[Dict[str, Any]]],
+        *,
+        maxsize: int = 10000,
+        ttl: float = 3600,
+        stale_ttl: float = 3600,
+        writes: Optional[WriteBuffer] = None
+    ) -> None:
+        super().__init__(maxsize)
+        self._loader = loader
+        self._writes: Optional[WriteBuffer] = writes
+        self._loading: Dict[Hashable, asyncio.Task] = {}
+        self._ttl: float = ttl
+        self._stale_ttl: float = stale_ttl
+
+        self.stale_hits: int = 0
+        self.refreshes: int = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        # Stale hits are counted in `hits` as well, they were served from the cache.
+        return {**super().stats, "stale_hits": self.stale_hits, "refreshes": self.refreshes}
+
+    async def _load(self, key: Hashable) -> Dict[str, Any]:
+        for _ in range(LOAD_ATTEMPTS):
+            # flush() also waits for a write of the key which is already running.
+            if self._writes is not None and key in self._writes:
+                await self._writes.flush()
+
+            document = await self._loader(key)
+            if self._writes is None or key not in self._writes:
+                break
+
+        expires_at = time.monotonic() + self._ttl
+
+        if (entry := self._entries.get(key)) is not None:
+            # Refresh in place, so references held elsewhere see the new data.
+            entry[1].clear()
+            entry[1].update(document)
+            entry[0] = expires_at
+            return entry[1]
+
+        self.put(key, [expires_at, document])
+        return document
+
+    def _start_load(self, key: Hashable) -> asyncio.Task:
+        if (task := self._loading.get(key)) is None:
+            task = self._loading[key] = asyncio.get_running_loop().create_task(self._load(key))
+            task.add_done_callback(lambda t: self._load_done(key, t))
+        return task
+
+    def _load_done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._loading.get(key) is task:
+            del self._loading[key]
+
+        if not task.cancelled():
+            task.exception()
+
+    async def get(self, key: Hashable) -> Dict[str, Any]:
+        """Returns the document of the key, loading it on a miss."""
+        entry: Optional[List[Any]] = self._entries.get(key)
+        if entry is not None and (age := time.monotonic() - entry[0]) <= self._stale_ttl:
+            super().get(key)
+            if age > 0:
+                self.stale_hits += 1
+                if key not in self._loading:
+                    self.refreshes += 1
+                    self._start_load(key)
+            return entry[1]
+
+        self.misses += 1
+        return await asyncio.shield(self._start_load(key))
+
+    def peek(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Returns the cached document of the key without loading it, even if it is stale."""
+        entry = self._entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def set_fields(self, key: Hashable, fields: Dict[str, Any]) -> None:
+        """Applies fields which were already written to the database to the cached document, if any."""
+        if (document := self.peek(key)) is not None:
+            document.update(fields)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drops the document of the key, or every document when no key is given."""
+        if key is None:
+            self.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def prune(self) -> int:
+        """Drops documents which are past their stale window and returns how many were dropped."""
+        deadline = time.monotonic() - self._stale_ttl
+        expired = [key for key, entry in self._entries.items() if entry[0] < deadline]
+        for key in expired:
+            del self._entries[key]
+        return len(expired)
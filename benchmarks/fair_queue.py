@@ -0,0 +1,88 @@
+"""MIT License
+
+Copyright (c) 2023 - present Vocard Development
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""Times FairQueue.put for a 1000-track queue shared by 20 requesters.
+
+Run from the repository root: python -m benchmarks.fair_queue
+"""
+
+import random
+import time
+
+from types import SimpleNamespace
+from typing import List, Optional
+
+from voicelink import Track, encode
+from voicelink.queue import FairQueue
+
+import function as func
+
+TRACKS = 1000
+REQUESTERS = 20
+RUNS = 5
+
+class ScanFairQueue(FairQueue):
+    """FairQueue without the cached rounds, placing every track with the linear scan."""
+
+    def _sync_rounds(self) -> None:
+        return None
+
+def build_tracks(seed: int = 1) -> List[Track]:
+    tracks = []
+    for i in range(TRACKS):
+        info = {
+            "title": f"Song {i}", "author": f"Author {i % 7}", "length": 200000 + i,
+            "identifier": f"id{i:05d}", "isStream": False, "uri": f"https://www.youtube.com/watch?v=id{i:05d}",
+            "artworkUrl": None, "isrc": None, "sourceName": "youtube", "position": 0
+        }
+        tracks.append(Track(track_id=encode(info), info=info, requester=i % REQUESTERS))
+
+    random.Random(seed).shuffle(tracks)
+    return tracks
+
+def time_puts(queue_cls: type, tracks: List[Track], compact: bool) -> float:
+    best: Optional[float] = None
+    for _ in range(RUNS):
+        queue = queue_cls(TRACKS * 2, True, lambda key: key, compact)
+        queue.put(tracks[0])
+        queue.get()
+
+        start = time.perf_counter()
+        for track in tracks:
+            queue.put(track)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main() -> None:
+    # Tracks look up their source emoji in the bot settings, which are only loaded by main.py.
+    func.settings = SimpleNamespace(sources_settings={"others": {}})
+    tracks = build_tracks()
+    print(f"FairQueue.put, {TRACKS} tracks from {REQUESTERS} requesters (best of {RUNS})")
+    for compact in (False, True):
+        for name, queue_cls in (("rounds", FairQueue), ("scan", ScanFairQueue)):
+            elapsed = time_puts(queue_cls, tracks, compact)
+            print(f"  {name:<6} compact={compact!s:<5} {elapsed * 1000:8.2f} ms  {elapsed / TRACKS * 1e6:6.1f} us/put")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""MIT License
+
+Copyright (c) 2023 - present Vocard Development
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""Times read_utfm against the pure Python _read_utfm_slow decoder on ASCII, CJK and emoji titles.
+
+Run from the repository root: python -m benchmarks.utfm
+"""
+
+import timeit
+
+from voicelink.transformer import read_utfm, _read_utfm_slow
+
+TITLES = {
+    "ascii": "Rick Astley - Never Gonna Give You Up (Official Music Video)",
+    "cjk": "米津玄師 - Lemon / 夜に駆ける - YOASOBI (公式ミュージックビデオ)",
+    "emoji": "Lo-fi beats 🎧🔥 to relax/study to ✨🌙 (2 hour mix) 💤"
+}
+NUMBER = 100000
+
+def to_modified_utf8(text: str) -> bytes:
+    """Encodes text the way Java's DataOutput.writeUTF does."""
+    encoded = bytearray()
+    for char in text:
+        code = ord(char)
+        if code == 0:
+            encoded += b"\xc0\x80"
+        elif code > 0xFFFF:
+            code -= 0x10000
+            for surrogate in (0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF)):
+                encoded += chr(surrogate).encode("utf-8", "surrogatepass")
+        else:
+            encoded += char.encode("utf-8")
+    return bytes(encoded)
+
+def main() -> None:
+    print(f"read_utfm vs _read_utfm_slow ({NUMBER} calls each)")
+    for name, title in TITLES.items():
+        data = to_modified_utf8(title)
+        assert read_utfm(len(data), data) == _read_utfm_slow(len(data), data) == title
+
+        fast = timeit.timeit(lambda: read_utfm(len(data), data), number=NUMBER)
+        slow = timeit.timeit(lambda: _read_utfm_slow(len(data), data), number=NUMBER)
+        print(f"  {name:<6} {len(data):4d} bytes  fast {fast / NUMBER * 1e9:7.0f} ns  slow {slow / NUMBER * 1e9:7.0f} ns  {slow / fast:5.1f}x")
+
+if __name__ == "__main__":
+    main()
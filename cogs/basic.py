@@ -41,7 +41,7 @@ from function import (
 )
 
 from voicelink import SearchType, LoopType
-from addons import LYRICS_PLATFORMS
+from addons import LYRICS_PLATFORMS, SearchAutocomplete
 from views import SearchView, ListView, LinkView, LyricsView, HelpView
 from validators import url
 
@@ -78,6 +78,7 @@ class Basic(commands.Cog):
             callback=self._play
         )
         self.bot.tree.add_command(self.ctx_menu)
+        self.search_autocomplete = SearchAutocomplete()
 
     async def cog_unload(self) -> None:
         self.bot.tree.remove_command(self.ctx_menu.name, type=self.ctx_menu.type)
@@ -90,20 +91,24 @@ class Basic(commands.Cog):
             return []
 
         if current:
-            node = voicelink.NodePool.get_node()
-            if not node:
-                return []
+            async def fetch() -> list[tuple[str, str]]:
+                node = voicelink.NodePool.get_node()
+                if not node:
+                    return []
 
-            tracks: list[voicelink.Track] = await node.get_tracks(current, requester=interaction.user)
-            if not tracks:
-                return []
+                tracks: list[voicelink.Track] = await node.get_tracks(current, requester=interaction.user)
+                if not tracks:
+                    return []
 
-            if isinstance(tracks, voicelink.Playlist):
-                tracks = tracks.tracks
+                if isinstance(tracks, voicelink.Playlist):
+                    tracks = tracks.tracks
 
-            return [app_commands.Choice(name=truncate_string(f"🎵 {track.author} - {track.title}", 100), value=truncate_string(f"{track.author} - {track.title}", 100)) for track in tracks]
+                return [(track.author, track.title) for track in tracks]
 
-        history = {track["identifier"]: track for track_id in reversed(await get_user(interaction.user.id, "history")) if (track := voicelink.decode(track_id))["uri"]}
+            results = await self.search_autocomplete.search(interaction.user.id, current, fetch)
+            return [app_commands.Choice(name=truncate_string(f"🎵 {author} - {title}", 100), value=truncate_string(f"{author} - {title}", 100)) for author, title in results][:25]
+
+        history = {track["identifier"]: track for track in voicelink.decode_many(reversed(await get_user(interaction.user.id, "history", need_copy=False))) if track["uri"]}
         return [app_commands.Choice(name=truncate_string(f"🕒 {track['author']} - {track['title']}", 100), value=track['uri']) for track in history.values() if len(track['uri']) <= 100][:25]
 
     @commands.hybrid_command(name="connect", aliases=get_aliases("connect"))
@@ -549,7 +554,7 @@ class Basic(commands.Cog):
             track_ids = bytes.split(b"\n")[-1]
             track_ids = track_ids.decode().split(",")
 
-            tracks = [voicelink.Track(track_id=track_id, info=voicelink.decode(track_id), requester=ctx.author) for track_id in track_ids]
+            tracks = await player.node.build_tracks(track_ids, requester=ctx.author)
             if not tracks:
                 return await send(ctx, "noTrackFound")
 
@@ -654,12 +659,12 @@ class Basic(commands.Cog):
 
     @commands.hybrid_command(name="remove", aliases=get_aliases("remove"))
     @app_commands.describe(
-        position1="Input a position from the queue to be removed.",
+        position1="Input a position from the queue to be removed. Leave it empty to remove every track of the member.",
         position2="Set the range of the queue to be removed.",
         member="Remove tracks requested by a specific member."
     )
     @commands.dynamic_cooldown(cooldown_check, commands.BucketType.guild)
-    async def remove(self, ctx: commands.Context, position1: int, position2: int = None, member: discord.Member = None):
+    async def remove(self, ctx: commands.Context, position1: int = None, position2: int = None, member: discord.Member = None):
         "Removes specified track or a range of tracks from the queue."
         player: voicelink.Player = ctx.guild.voice_client
         if not player:
@@ -668,7 +673,12 @@ class Basic(commands.Cog):
         if not player.is_privileged(ctx.author):
             return await send(ctx, "missingQueuePerm", ephemeral=True)
 
-        removed_tracks = await player.remove_track(position1, position2, remove_target=member, requester=ctx.author)
+        if position1 is None:
+            if member is None:
+                return await send(ctx, "voicelinkOutofList", ephemeral=True)
+            removed_tracks = await player.remove_tracks_by_requester(member, requester=ctx.author)
+        else:
+            removed_tracks = await player.remove_track(position1, position2, remove_target=member, requester=ctx.author)
         await send(ctx, "removed", len(removed_tracks.keys()))
 
     @commands.hybrid_command(name="forward", aliases=get_aliases("forward"))
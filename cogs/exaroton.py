@@ -30,10 +30,7 @@ class Exaroton(commands.Cog):
                 upsert=True
             )
 
-            if guild_id in func.SETTINGS_BUFFER:
-                func.SETTINGS_BUFFER[guild_id]["exaroton_server"] = exaroton_settings
-            else:
-                func.SETTINGS_BUFFER[guild_id] = {"exaroton_server": exaroton_settings}
+            func.SETTINGS_CACHE.set_fields(guild_id, {"exaroton_server": exaroton_settings})
 
             return True
         except Exception as e:
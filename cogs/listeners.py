@@ -84,25 +84,27 @@ class Listeners(commands.Cog):
 
                 # Restore the queue.
                 queue_data = data.get("queue", {})
-                for track_data in queue_data.get("tracks", []):
-                    track_id = track_data.get("track_id")
-                    if not track_id:
-                        continue
-
-                    decoded_track = voicelink.decode(track_id)
-                    requester = channel.guild.get_member(track_data.get("requester_id"))
-                    track = voicelink.Track(track_id=track_id, info=decoded_track, requester=requester)
-                    player.queue._queue.append(track)
+                saved_tracks = queue_data.get("tracks", [])
+                tracks_data = [track_data for track_data in saved_tracks if track_data.get("track_id")]
+                decoded_tracks = await player.node.decode_tracks([track_data["track_id"] for track_data in tracks_data])
+                player.queue.restore(
+                    voicelink.Track(track_id=track_data["track_id"], info=decoded_track, requester=channel.guild.get_member(track_data.get("requester_id")))
+                    for track_data, decoded_track in zip(tracks_data, decoded_tracks) if decoded_track is not None
+                )
                 
-                # Restore queue settings.
-                player.queue._position = queue_data.get("position", 0) - 1
+                # Restore queue settings. Saved indexes are shifted back by the tracks before them which couldn't be restored.
+                decoded = iter(decoded_tracks)
+                restored = [bool(track_data.get("track_id")) and next(decoded) is not None for track_data in saved_tracks]
+                shift = lambda index: index - restored[:max(index, 0)].count(False)
+
+                player.queue._position = shift(queue_data.get("position", 0) - 1)
                 repeat_mode = queue_data.get("repeat_mode", "OFF")
                 try:
                     loop_mode = voicelink.LoopType[repeat_mode]
                 except KeyError:
                     loop_mode = voicelink.LoopType.OFF
                 player.queue._repeat.set_mode(loop_mode)
-                player.queue._repeat_position = queue_data.get("repeat_position")
+                player.queue._repeat_position = shift(queue_data.get("repeat_position") or 0)
 
                 # Restore player settings
                 player.dj = dj_member
@@ -132,6 +134,21 @@ class Listeners(commands.Cog):
         except Exception as del_error:
             func.logger.error("Failed to remove session file: %s", file_path, exc_info=del_error)
 
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.guild and isinstance(player := message.guild.voice_client, voicelink.Player):
+            player.track_channel_message(message)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        if (guild := self.bot.get_guild(payload.guild_id)) and isinstance(player := guild.voice_client, voicelink.Player):
+            player.track_channel_message_delete(payload)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        if (guild := self.bot.get_guild(payload.guild_id)) and isinstance(player := guild.voice_client, voicelink.Player):
+            player.track_channel_message_delete(payload)
+
     @commands.Cog.listener()
     async def on_voicelink_track_end(self, player: voicelink.Player, track, _):
         await player.do_next()
@@ -47,7 +47,7 @@ def assign_playlist_id(existed: list) -> str:
             return str(i)
 
 async def check_playlist_perms(user_id: int, author_id: int, d_id: str) -> dict:
-    playlist = await get_user(author_id, 'playlist')
+    playlist = await get_user(author_id, 'playlist', fields=[f'playlist.{d_id}'])
     playlist = playlist.get(d_id)
     if not playlist or user_id not in playlist['perms']['read']:
         return {}
@@ -93,7 +93,7 @@ class Playlists(commands.Cog, name="playlist"):
         self.description = "This is the Vocard playlist system. You can save your favorites and use Vocard to play on any server."
 
     async def playlist_autocomplete(self, interaction: discord.Interaction, current: str) -> list:
-        playlists_raw: dict[str, dict] = await get_user(interaction.user.id, 'playlist')
+        playlists_raw: dict[str, dict] = await get_user(interaction.user.id, 'playlist', fields=['playlist.*.name'])
         playlists = [value['name'] for value in playlists_raw.values()] if playlists_raw else []
         if current:
             return [app_commands.Choice(name=p, value=p) for p in playlists if current in p]
@@ -136,9 +136,11 @@ class Playlists(commands.Cog, name="playlist"):
             if not result['playlist']['tracks']:
                 return await send(ctx, 'playlistNoTrack', result['playlist']['name'], ephemeral=True)
 
-            _tracks = []
-            for track in result['playlist']['tracks'][:max_t]:
-                _tracks.append(voicelink.Track(track_id=track, info=voicelink.decode(track), requester=ctx.author))
+            track_ids = result['playlist']['tracks'][:max_t]
+            _tracks = [
+                voicelink.Track(track_id=track_id, info=info, requester=ctx.author)
+                for track_id, info in zip(track_ids, voicelink.decode_many(track_ids))
+            ]
                     
             tracks = {"name": result['playlist']['name'], "tracks": _tracks}
 
@@ -182,8 +184,7 @@ class Playlists(commands.Cog, name="playlist"):
                             continue
                         
                     init = []
-                    for track in playlist['tracks']:
-                        dt = voicelink.decode(track)
+                    for dt in voicelink.decode_many(playlist['tracks']):
                         time += dt.get("length", 0)
                         init.append(dt)
                     playlist['tracks'] = init
@@ -283,7 +284,7 @@ class Playlists(commands.Cog, name="playlist"):
         if member.id in result['playlist']['perms']['read']:
             return await send(ctx, 'playlistShare', member, ephemeral=True)
 
-        receiver = await get_user(member.id)
+        receiver = await get_user(member.id, need_copy=False)
         if not receiver:
             return await send(ctx, 'noPlaylistAcc', member)
         for mail in receiver['inbox']:
@@ -449,9 +450,11 @@ class Playlists(commands.Cog, name="playlist"):
             if not result['playlist']['tracks']:
                 return await send(ctx, 'playlistNoTrack', result['playlist']['name'], ephemeral=True)
 
-            _tracks = []
-            for track in result['playlist']['tracks']:
-                _tracks.append(voicelink.Track(track_id=track, info=voicelink.decode(track), requester=ctx.author))
+            track_ids = result['playlist']['tracks']
+            _tracks = [
+                voicelink.Track(track_id=track_id, info=info, requester=ctx.author)
+                for track_id, info in zip(track_ids, voicelink.decode_many(track_ids))
+            ]
                     
             tracks = {"name": result['playlist']['name'], "tracks": _tracks}
 
@@ -27,11 +27,8 @@ class Restaurant(commands.Cog):
                 upsert=True
             )
 
-            # Update the buffer cache
-            if guild_id in func.SETTINGS_BUFFER:
-                func.SETTINGS_BUFFER[guild_id]["restaurants"] = restaurants
-            else:
-                func.SETTINGS_BUFFER[guild_id] = {"restaurants": restaurants}
+            # Update the cached settings
+            func.SETTINGS_CACHE.set_fields(guild_id, {"restaurants": restaurants})
 
             return True
         except Exception as e:
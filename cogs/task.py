@@ -104,8 +104,10 @@ class Task(commands.Cog):
 
     @tasks.loop(hours=12.0)
     async def cache_cleaner(self):
-        func.SETTINGS_BUFFER.clear()
-        func.USERS_BUFFER.clear()
+        for name, cache in (("settings", func.SETTINGS_CACHE), ("users", func.USERS_CACHE)):
+            pruned = cache.prune()
+            func.logger.debug(f"Pruned {pruned} {name} cache entries: {cache.stats}")
+        func.logger.debug(f"User write buffer: {func.USERS_WRITE_BUFFER.stats}")
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Task(bot))
\ No newline at end of file
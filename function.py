@@ -25,15 +25,18 @@ import discord, json, os, copy, logging
 
 from discord.ext import commands
 from time import strptime
-from addons import Settings
+from addons import Settings, DocumentCache, WriteBuffer, PartialWrite
 
 from typing import (
     Optional,
     Union,
     Dict,
+    List,
     Any
 )
 
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from motor.motor_asyncio import (
     AsyncIOMotorClient,
     AsyncIOMotorCollection,
@@ -54,8 +57,6 @@ USERS_DB: AsyncIOMotorCollection
 
 LANGS: dict[str, dict[str, str]] = {} #Stores all the languages in ./langs
 LOCAL_LANGS: dict[str, dict[str, str]] = {} #Stores all the localization languages in ./local_langs
-SETTINGS_BUFFER: dict[int, dict[str, Any]] = {} #Cache guild language
-USERS_BUFFER: dict[str, dict] = {}
 
 MISSING_TRANSLATOR: dict[str, list[str]] = {}
 
@@ -160,7 +161,7 @@ def truncate_string(text: str, length: int = 40) -> str:
     return text[:length - 3] + "..." if len(text) > length else text
     
 def get_lang_non_async(guild_id: int, *keys) -> Union[list[str], str]:
-    settings = SETTINGS_BUFFER.get(guild_id, {})
+    settings = SETTINGS_CACHE.peek(guild_id) or {}
     lang = settings.get("lang", "EN")
     if lang in LANGS and not LANGS[lang]:
         LANGS[lang] = open_json(os.path.join("langs", f"{lang}.json"))
@@ -249,7 +250,7 @@ async def send(
 
     return message
 
-async def update_db(db: AsyncIOMotorCollection, tempStore: dict, filter: dict, data: dict) -> bool:
+def apply_update(tempStore: dict, data: dict) -> bool:
     for mode, action in data.items():
         for key, value in action.items():
             cursors = key.split(".")
@@ -272,14 +273,10 @@ async def update_db(db: AsyncIOMotorCollection, tempStore: dict, filter: dict, d
 
             elif mode == "$push":
                 if isinstance(value, dict) and "$each" in value:
-                    nested_data.setdefault(cursors[-1], []).extend(value["$each"][value.get("$slice", len(value["$each"])):])
-                else:
-                    nested_data.setdefault(cursors[-1], []).extend([value])
-                    
-            elif mode == "$push":
-                if isinstance(value, dict) and "$each" in value:
-                    nested_data.setdefault(cursors[-1], []).extend(value["$each"])
-                    nested_data[cursors[-1]] = nested_data[cursors[-1]][value.get("$slice", len(value["$each"])):]
+                    items = nested_data.setdefault(cursors[-1], [])
+                    items.extend(value["$each"])
+                    if (slice := value.get("$slice")) is not None:
+                        nested_data[cursors[-1]] = items[slice:] if slice < 0 else items[:slice]
                 else:
                     nested_data.setdefault(cursors[-1], []).extend([value])
 
@@ -290,39 +287,97 @@ async def update_db(db: AsyncIOMotorCollection, tempStore: dict, filter: dict, d
                     
             else:
                 return False
+    return True
+
+async def update_db(db: AsyncIOMotorCollection, tempStore: dict, filter: dict, data: dict) -> bool:
+    if not apply_update(tempStore, data):
+        return False
 
     result = await db.update_one(filter, data)
     return result.modified_count > 0
 
-async def get_settings(guild_id:int) -> dict[str, Any]:
-    settings = SETTINGS_BUFFER.get(guild_id, None)
+async def _load_settings(guild_id: int) -> dict[str, Any]:
+    settings = await SETTINGS_DB.find_one({"_id": guild_id})
     if not settings:
-        settings = await SETTINGS_DB.find_one({"_id": guild_id})
-        if not settings:
-            await SETTINGS_DB.insert_one({"_id": guild_id})
-            
-        settings = SETTINGS_BUFFER[guild_id] = settings or {}
+        settings = {"_id": guild_id}
+        await SETTINGS_DB.insert_one(settings)
     return settings
 
+async def _load_user(user_id: int) -> dict[str, Any]:
+    user = await USERS_DB.find_one({"_id": user_id})
+    if not user:
+        user = {"_id": user_id, **copy.deepcopy(USER_BASE)}
+        await USERS_DB.insert_one(user)
+    return user
+
+async def _write_users(operations: list[tuple[int, dict]]) -> None:
+    try:
+        await USERS_DB.bulk_write([UpdateOne({"_id": user_id}, data) for user_id, data in operations], ordered=True)
+    except BulkWriteError as e:
+        # An ordered bulk write stops at its first error, everything before it was applied.
+        write_errors = e.details.get("writeErrors")
+        raise PartialWrite(write_errors[0]["index"] if write_errors else len(operations)) from e
+
+USERS_WRITE_BUFFER = WriteBuffer(_write_users, interval=5.0, max_pending=500, logger=logger) #Write-behind buffer for user updates
+SETTINGS_CACHE = DocumentCache(_load_settings, maxsize=20000, ttl=6 * 3600, stale_ttl=6 * 3600) #Cache guild settings
+USERS_CACHE = DocumentCache(_load_user, maxsize=20000, ttl=3600, stale_ttl=3600, writes=USERS_WRITE_BUFFER)
+
+async def get_settings(guild_id:int) -> dict[str, Any]:
+    return await SETTINGS_CACHE.get(guild_id)
+
 async def update_settings(guild_id: int, data: dict[str, dict[str, Any]]) -> bool:
     settings = await get_settings(guild_id)
     return await update_db(SETTINGS_DB, settings, {"_id": guild_id}, data)
             
-async def get_user(user_id: int, d_type: Optional[str] = None, need_copy: bool = True) -> Dict[str, Any]:
-    user = USERS_BUFFER.get(user_id)
-    if not user:
-        user = await USERS_DB.find_one({"_id": user_id})
-        if not user:
-            user = {"_id": user_id, **USER_BASE}
-            await USERS_DB.insert_one(user)
-    
-        USERS_BUFFER[user_id] = user
-        
+def _project(data: dict[str, Any], path: List[str], result: dict[str, Any]) -> None:
+    key, rest = path[0], path[1:]
+    if key == "*":
+        items = data.items()
+    elif key in data:
+        items = ((key, data[key]),)
+    else:
+        return
+
+    for name, value in items:
+        if not rest:
+            result[name] = copy.deepcopy(value)
+        elif isinstance(value, dict):
+            _project(value, rest, result.setdefault(name, {}))
+
+def project_document(document: dict[str, Any], fields: List[str]) -> dict[str, Any]:
+    # Copies only the given dotted paths, "*" matches every key at that level.
+    result = {}
+    for field in fields:
+        _project(document, field.split("."), result)
+    return result
+
+async def get_user(
+    user_id: int,
+    d_type: Optional[str] = None,
+    need_copy: bool = True,
+    fields: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    # need_copy=False hands out the cached document itself, callers must not mutate it.
+    # fields are relative to the document root, e.g. ["playlist.*.name"].
+    user = await USERS_CACHE.get(user_id)
     if d_type:
-        user = user.setdefault(d_type, copy.deepcopy(USER_BASE.get(d_type)))
-            
+        user.setdefault(d_type, copy.deepcopy(USER_BASE.get(d_type)))
+
+    if fields:
+        user = project_document(user, fields)
+        return user.get(d_type, {}) if d_type else user
+
+    if d_type:
+        user = user[d_type]
     return copy.deepcopy(user) if need_copy else user
 
-async def update_user(user_id:int, data:dict) -> bool:
+async def update_user(user_id:int, data:dict, buffered: bool = False) -> bool:
     playlist = await get_user(user_id, need_copy=False)
-    return await update_db(USERS_DB, playlist, {"_id": user_id}, data)
\ No newline at end of file
+    if not buffered:
+        return await update_db(USERS_DB, playlist, {"_id": user_id}, data)
+
+    # The cached document is updated right away, the database write is batched.
+    if not apply_update(playlist, data):
+        return False
+    USERS_WRITE_BUFFER.add(user_id, data)
+    return True
\ No newline at end of file
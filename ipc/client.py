@@ -4,7 +4,7 @@ import logging
 import function as func
 
 from discord.ext import commands
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 from .methods import process_methods
 
@@ -17,6 +17,8 @@ class IPCClient:
         password: str,
         heartbeat: int = 30,
         secure: bool = False,
+        update_interval: float = 1.0,
+        batch_updates: bool = False,
         *arg,
         **kwargs
     ) -> None:
@@ -36,6 +38,14 @@ class IPCClient:
         self._websocket: Optional[aiohttp.ClientWebSocketResponse] = None
         self._task: Optional[asyncio.Task] = None
 
+        # Player updates are coalesced per guild and flushed once per interval.
+        # Batching them into a single frame needs a dashboard which understands "playerUpdates".
+        self._update_interval: float = update_interval
+        self._batch_updates: bool = batch_updates
+        self._player_updates: Dict[str, dict] = {}
+        self._sent_player_states: Dict[str, Tuple[bool, int]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
         self._heanders = {
             "Authorization": self._password,
             "User-Id": str(bot.user.id),
@@ -74,21 +84,63 @@ class IPCClient:
                 await self._websocket.send_json(data)
                 self._logger.debug(f"Send Message: {data}")
 
-    async def send(self, data: dict):
+    async def send(self, data: dict) -> bool:
+        """Sends the data to the dashboard and returns whether it was sent."""
         # Check if the websocket is still open
         if self.is_connected:
             try:
                 await self._websocket.send_json(data)
                 self._logger.debug(f"Sent Message: {data}")
+                return True
             except ConnectionResetError:
                 self._logger.warning("Connection lost, attempting to reconnect.")
-                await self._handle_reconnect(data)
+                return await self._handle_reconnect(data)
             except Exception as e:
                 self._logger.error(f"Failed to send message: {e}")
         else:
             self._logger.warning("WebSocket is not connected or already closed.")
+        return False
+
+    def queue_player_update(self, payload: dict) -> None:
+        """Queues a playerUpdate payload, replacing any pending update of the same guild.
+           Updates which don't change the last sent state are dropped.
+        """
+        guild_id = payload["guildId"]
+        if self._sent_player_states.get(guild_id) == (payload["isConnected"], payload["lastPosition"]):
+            return
+
+        self._player_updates[guild_id] = payload
+        if not self._flush_task or self._flush_task.done():
+            self._flush_task = self._bot.loop.create_task(self._flush_player_updates())
+
+    def _is_player_watched(self, guild_id: str) -> bool:
+        guild = self._bot.get_guild(int(guild_id))
+        return bool(guild and getattr(guild.voice_client, "_ipc_connection", False))
+
+    async def _flush_player_updates(self) -> None:
+        await asyncio.sleep(self._update_interval)
+        updates, self._player_updates = self._player_updates, {}
+
+        # The dashboard may have stopped watching a player since its update was queued.
+        updates = {guild_id: payload for guild_id, payload in updates.items() if self._is_player_watched(guild_id)}
+        if not updates:
+            return
+
+        if self._batch_updates:
+            sent = updates if await self.send({"op": "playerUpdates", "updates": list(updates.values())}) else {}
+        else:
+            sent = {guild_id: payload for guild_id, payload in updates.items() if await self.send(payload)}
+
+        # Only remember what the dashboard actually received, so failed updates go out again.
+        for guild_id, payload in sent.items():
+            self._sent_player_states[guild_id] = (payload["isConnected"], payload["lastPosition"])
+
+    def forget_player(self, guild_id: int) -> None:
+        """Drops the pending and last sent update state of a guild's player."""
+        self._player_updates.pop(str(guild_id), None)
+        self._sent_player_states.pop(str(guild_id), None)
 
-    async def _handle_reconnect(self, data: dict):
+    async def _handle_reconnect(self, data: dict) -> bool:
         await self.disconnect()
         await self.connect()
         await asyncio.sleep(1)  # Optional delay before retrying
@@ -96,10 +148,12 @@ class IPCClient:
             try:
                 await self._websocket.send_json(data)
                 self._logger.debug(f"Sent Message on reconnect: {data}")
+                return True
             except Exception as e:
                 self._logger.error(f"Failed to send message on reconnect: {e}")
         else:
             self._logger.error("Reconnection failed, not connected.")
+        return False
                     
     async def connect(self):    
         try:
@@ -116,6 +170,8 @@ class IPCClient:
 
             self._task = self._bot.loop.create_task(self._listen())
             self._is_connected = True
+            # A new dashboard connection starts without any player state.
+            self._sent_player_states.clear()
             
             self._logger.info("Connected to dashboard!")
         
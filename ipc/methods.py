@@ -358,13 +358,13 @@ def _assign_playlist_id(existed: list) -> str:
             return str(i)
         
 async def _getPlaylist(user_id: int, playlist_id: str) -> Dict:
-    playlists = await func.get_user(user_id, "playlist")
+    playlists = await func.get_user(user_id, "playlist", fields=[f"playlist.{playlist_id}"])
     playlist = playlists.get(playlist_id)
     if not playlist:
         return
     
     if playlist["type"] == "share":
-        target_user = await func.get_user(playlist["user"], "playlist")
+        target_user = await func.get_user(playlist["user"], "playlist", fields=[f"playlist.{playlist['referId']}"])
         target_playlist = target_user.get(playlist["referId"])
         if target_playlist and user_id in target_playlist.get("perms", {}).get("read", []):
             playlist["tracks"] = await _loadPlaylist(target_playlist)
@@ -403,7 +403,7 @@ async def updatePlaylist(bot: commands.Bot, data: Dict) -> Dict:
                 "userId": str(user_id)
             }
         
-        playlist = await func.get_user(user_id, "playlist")
+        playlist = await func.get_user(user_id, "playlist", fields=["playlist.*.name"])
         if len(list(playlist.keys())) >= max_p:
             return {
                 "op": "updatePlaylist",
@@ -473,7 +473,7 @@ async def updatePlaylist(bot: commands.Bot, data: Dict) -> Dict:
                 "userId": str(user_id)
             }
         
-        playlist = await func.get_user(user_id, "playlist")
+        playlist = await func.get_user(user_id, "playlist", fields=["playlist.*.name"])
         for data in playlist.values():
             if data['name'].lower() == name.lower():
                 return {
@@ -571,7 +571,7 @@ async def updatePlaylist(bot: commands.Bot, data: Dict) -> Dict:
             
             del inbox[index]
             if is_accept:
-                share_playlists = await func.get_user(mail["sender"], "playlist")
+                share_playlists = await func.get_user(mail["sender"], "playlist", fields=[f"playlist.{refer_id}"])
                 if refer_id not in share_playlists:
                     return error_msg("The shared playlist couldn’t be found. It’s possible that the user has already deleted it.", user_id=user_id)
                 
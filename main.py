@@ -69,6 +69,11 @@ class Vocard(commands.Bot):
 
         self.ipc: IPCClient
 
+    async def close(self) -> None:
+        # Write out the buffered user updates before the connections go away.
+        await func.USERS_WRITE_BUFFER.drain()
+        await super().close()
+
     async def on_message(self, message: discord.Message, /) -> None:
         # Ignore messages from bots or DMs
         if message.author.bot or not message.guild:
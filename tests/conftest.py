@@ -0,0 +1,24 @@
+# Import voicelink before addons, in the same order as main.py. The two packages
+# import each other through function.py, which only resolves from this side.
+import voicelink  # noqa: F401
+import function as func
+import pytest
+
+from types import SimpleNamespace
+
+from voicelink import Track, encode
+
+@pytest.fixture
+def make_track(monkeypatch):
+    # Tracks look up their source emoji in the bot settings, which are only loaded by main.py.
+    monkeypatch.setattr(func, "settings", SimpleNamespace(sources_settings={"others": {}}), raising=False)
+
+    def make_track(i: int, requester) -> Track:
+        info = {
+            "title": f"Song {i}", "author": "Author", "length": 200000,
+            "identifier": f"id{i:05d}", "isStream": False, "uri": f"https://www.youtube.com/watch?v=id{i:05d}",
+            "artworkUrl": None, "isrc": None, "sourceName": "youtube", "position": 0
+        }
+        return Track(track_id=encode(info), info=info, requester=requester)
+
+    return make_track
@@ -0,0 +1,117 @@
+import asyncio
+
+from addons.buffer import WriteBuffer, PartialWrite
+
+def run(coro):
+    return asyncio.run(coro)
+
+class Writer:
+    def __init__(self, delay: float = 0) -> None:
+        self.delay = delay
+        self.batches = []
+        self.failures = 0
+        self.partial = None
+
+    async def __call__(self, operations):
+        await asyncio.sleep(self.delay)
+        if self.partial is not None:
+            written, self.partial = self.partial, None
+            self.batches.append(operations[:written])
+            raise PartialWrite(written)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("write failed")
+        self.batches.append(operations)
+
+def history_push(track_id):
+    return {"$push": {"history": {"$each": [track_id], "$slice": -3}}}
+
+def test_merges_updates_per_key():
+    async def main():
+        writer = Writer()
+        buffer = WriteBuffer(writer, interval=60)
+        for index in range(5):
+            buffer.add(1, history_push(index))
+        buffer.add(1, {"$inc": {"plays": 2}})
+        buffer.add(1, {"$inc": {"plays": 3}})
+        buffer.add(1, {"$set": {"history": []}})
+
+        assert len(buffer) == 2
+        assert await buffer.flush() == 2
+        return writer.batches
+
+    (batch,) = run(main())
+    assert batch == [
+        (1, {"$push": {"history": {"$each": [2, 3, 4], "$slice": -3}}, "$inc": {"plays": 5}}),
+        (1, {"$set": {"history": []}})
+    ]
+
+def test_key_is_contained_while_its_write_runs():
+    async def main():
+        buffer = WriteBuffer(Writer(delay=0.05), interval=60)
+        buffer.add(1, history_push("a"))
+        flush = asyncio.create_task(buffer.flush())
+        await asyncio.sleep(0.01)
+
+        assert len(buffer) == 0
+        assert 1 in buffer
+        await flush
+        assert 1 not in buffer
+
+    run(main())
+
+def test_timer_runs_after_size_triggered_flush():
+    async def main():
+        writer = Writer(delay=0.02)
+        buffer = WriteBuffer(writer, interval=0.05, max_pending=1)
+        buffer.add(1, {"$set": {"a": 1}})
+        await asyncio.sleep(0)
+
+        # Over the threshold while the size-triggered flush is still writing.
+        buffer.add(2, {"$set": {"a": 2}})
+        await asyncio.sleep(0.2)
+        return writer.batches, len(buffer)
+
+    batches, pending = run(main())
+    assert [[key for key, _ in batch] for batch in batches] == [[1], [2]]
+    assert pending == 0
+
+def test_failed_writes_are_retried_in_order():
+    async def main():
+        writer = Writer()
+        writer.failures = 1
+        buffer = WriteBuffer(writer, interval=60)
+        buffer.add(1, history_push("a"))
+        await buffer.flush()
+        buffer.add(1, {"$set": {"history": []}})
+        await buffer.flush()
+        return writer.batches
+
+    (batch,) = run(main())
+    assert batch == [
+        (1, {"$push": {"history": {"$each": ["a"], "$slice": -3}}}),
+        (1, {"$set": {"history": []}})
+    ]
+
+def test_partial_write_only_retries_the_rest():
+    async def main():
+        writer = Writer()
+        writer.partial = 1
+        buffer = WriteBuffer(writer, interval=60)
+        buffer.add(1, {"$inc": {"plays": 1}})
+        buffer.add(2, {"$inc": {"plays": 1}})
+        await buffer.flush()
+        await buffer.flush()
+        return writer.batches
+
+    assert [[key for key, _ in batch] for batch in run(main())] == [[1], [2]]
+
+def test_drain_reports_dropped_updates():
+    async def main():
+        writer = Writer()
+        writer.failures = 10
+        buffer = WriteBuffer(writer, interval=60, max_retries=2)
+        buffer.add(1, {"$set": {"a": 1}})
+        return await buffer.drain(), buffer.stats["dropped"], len(buffer)
+
+    assert run(main()) == (1, 1, 0)
@@ -0,0 +1,90 @@
+import asyncio
+
+from addons.buffer import WriteBuffer
+from addons.cache import DocumentCache
+
+def run(coro):
+    return asyncio.run(coro)
+
+class FakeUsers:
+    """A user collection whose loads and writes take a while, like a remote database."""
+
+    def __init__(self, delay: float = 0.02) -> None:
+        self.delay = delay
+        self.documents = {1: {"_id": 1, "history": ["a"]}}
+        self.loads = 0
+
+    async def load(self, user_id):
+        self.loads += 1
+        document = {**self.documents[user_id], "history": list(self.documents[user_id]["history"])}
+        await asyncio.sleep(self.delay)
+        return document
+
+    async def write(self, operations):
+        await asyncio.sleep(self.delay)
+        for user_id, update in operations:
+            self.documents[user_id]["history"].extend(update["$push"]["history"]["$each"])
+
+def push(document, buffer, user_id, track_id):
+    # What update_user(..., buffered=True) does: update the cached copy now, write later.
+    document["history"].append(track_id)
+    buffer.add(user_id, {"$push": {"history": {"$each": [track_id]}}})
+
+def test_concurrent_misses_share_one_load():
+    async def main():
+        users = FakeUsers()
+        cache = DocumentCache(users.load, maxsize=10)
+        documents = await asyncio.gather(*(cache.get(1) for _ in range(10)))
+        return users.loads, all(document is documents[0] for document in documents), cache.stats
+
+    loads, shared, stats = run(main())
+    assert loads == 1 and shared
+    assert stats["misses"] == 10 and stats["size"] == 1
+
+def test_lru_eviction_uses_shared_counters():
+    async def main():
+        users = FakeUsers(delay=0)
+        users.documents.update({2: {"_id": 2, "history": []}, 3: {"_id": 3, "history": []}})
+        cache = DocumentCache(users.load, maxsize=2)
+        for user_id in (1, 2, 1, 3):
+            await cache.get(user_id)
+        return 1 in cache, 2 in cache, cache.stats
+
+    has_first, has_second, stats = run(main())
+    assert has_first and not has_second
+    assert stats["evictions"] == 1 and stats["hits"] == 1
+
+def test_refresh_waits_for_a_running_write():
+    async def main():
+        users = FakeUsers()
+        buffer = WriteBuffer(users.write, interval=60)
+        cache = DocumentCache(users.load, ttl=0, stale_ttl=60, writes=buffer)
+
+        document = await cache.get(1)
+        push(document, buffer, 1, "b")
+        write = asyncio.create_task(buffer.flush())
+        await asyncio.sleep(0)
+
+        # The entry is stale, so this serves it and starts a refresh while the write is running.
+        assert await cache.get(1) is document
+        await asyncio.gather(write, *cache._loading.values())
+        return document["history"]
+
+    assert run(main()) == ["a", "b"]
+
+def test_refresh_reloads_when_updates_arrive_during_the_load():
+    async def main():
+        users = FakeUsers()
+        buffer = WriteBuffer(users.write, interval=60)
+        cache = DocumentCache(users.load, ttl=0, stale_ttl=60, writes=buffer)
+
+        document = await cache.get(1)
+        await cache.get(1)
+        await asyncio.sleep(0)
+        push(document, buffer, 1, "b")
+        await asyncio.gather(*cache._loading.values())
+        return document["history"], users.loads
+
+    history, loads = run(main())
+    assert history == ["a", "b"]
+    assert loads == 3
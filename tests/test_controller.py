@@ -0,0 +1,121 @@
+import asyncio
+
+from types import SimpleNamespace
+
+import function as func
+import pytest
+
+from views import InteractiveController
+from voicelink import Player
+from voicelink.enums import LoopType
+from voicelink.queue import Queue
+
+BUTTONS = [
+    {
+        "back": {"emoji": "⏮️"},
+        "play-pause": {"states": {"pause": {"emoji": "⏸️"}, "resume": {"emoji": "▶️"}}},
+        "skip": {"emoji": "⏭️"},
+        "add-fav": {"emoji": "❤️"}
+    },
+    {
+        "loop": {"states": {"off": {"label": "Off"}, "track": {"label": "Track"}, "queue": {"label": "Queue"}}},
+        "volumemute": {"states": {"mute": {"emoji": "🔇"}, "muted": {"emoji": "🔈"}}},
+        "effects": {"label": "Effects"}
+    },
+    {"tracks": {"label": "Up next", "max_options": 3}}
+]
+
+def run(coro):
+    return asyncio.run(coro)
+
+def counting(init, calls):
+    def __init__(self, *args, **kwargs):
+        calls.append(self)
+        init(self, *args, **kwargs)
+    return __init__
+
+class FakeMessage:
+    def __init__(self) -> None:
+        self.id, self.edits = 1, []
+
+    async def edit(self, **kwargs) -> None:
+        self.edits.append(kwargs)
+
+@pytest.fixture
+def make_player(make_track, monkeypatch):
+    controller = {"buttons": BUTTONS}
+    monkeypatch.setattr(func.settings, "controller", controller, raising=False)
+
+    def make_player() -> Player:
+        player = Player.__new__(Player)
+        player.settings = {}
+        player.channel = object()
+        player.queue = Queue(100, True, lambda key: key)
+        player._ph = SimpleNamespace(replace=lambda text, variables: text or None)
+        player._current, player._volume = None, 100
+        player.controller, player._controller_view = None, None
+        player._messages_after_controller = 0
+        player.build_embed = lambda track=None: "embed"
+        return player
+
+    make_player.track = make_track
+    return make_player
+
+def components(view: InteractiveController) -> list:
+    items = []
+    for item in view.children:
+        data = item.to_component_dict()
+        data.pop("custom_id", None)
+        items.append((item.row, data))
+    return items
+
+def test_render_key_follows_the_components(make_player):
+    async def main():
+        player = make_player()
+        states = [lambda: None]
+        states.append(lambda: player.queue.put(make_player.track(0, "a")))
+        states.append(lambda: setattr(player, "_current", player.queue.get()))
+        states.append(lambda: player.queue.put(make_player.track(1, "a")))
+        states.append(lambda: player.queue._repeat.set_mode(LoopType.TRACK))
+        states.append(lambda: setattr(player, "_volume", 0))
+        # The play-pause button is always created in its pause states.
+        states.append(lambda: setattr(player, "_paused", True))
+
+        rendered = []
+        for change in states:
+            change()
+            rendered.append((InteractiveController.render_key(player), components(InteractiveController(player))))
+        return rendered
+
+    rendered = run(main())
+    assert len({key for key, _ in rendered}) == len(rendered) - 1
+    for i, (key, items) in enumerate(rendered):
+        for other_key, other_items in rendered[i + 1:]:
+            assert (key == other_key) == (items == other_items)
+
+def test_render_controller_builds_the_view_only_when_the_key_changes(make_player, monkeypatch):
+    built = []
+    monkeypatch.setattr("voicelink.player.InteractiveController.__init__", counting(InteractiveController.__init__, built))
+
+    async def main():
+        player = make_player()
+        player.controller = FakeMessage()
+        await player._render_controller()
+        await player._render_controller()
+        player._current = make_player.track(0, "a")
+        await player._render_controller()
+        return player.controller.edits
+
+    edits = run(main())
+    assert len(built) == 2
+    assert ["view" in edit for edit in edits] == [True, False, True]
+
+def test_render_controller_rechecks_the_setting(make_player):
+    async def main():
+        player = make_player()
+        player.controller = FakeMessage()
+        player.settings["controller"] = False
+        await player._render_controller()
+        return player.controller.edits, player._controller_view
+
+    assert run(main()) == ([], None)
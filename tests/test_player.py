@@ -0,0 +1,46 @@
+import asyncio
+
+from types import SimpleNamespace
+
+from voicelink import Player
+from voicelink.queue import Queue
+
+def run(coro):
+    return asyncio.run(coro)
+
+def make_player(tracks, compact: bool = False):
+    player = Player.__new__(Player)
+    player.queue = Queue(100, True, lambda key: key, compact)
+    for track in tracks:
+        player.queue.put(track)
+    player._ipc, player._ipc_connection = SimpleNamespace(_is_connected=True), True
+
+    sent = []
+    async def send_ws(payload, requester=None):
+        sent.append((payload, requester))
+    player.send_ws = send_ws
+    return player, sent
+
+def test_remove_tracks_by_requester_sends_remove_track(make_track):
+    spammer, other, moderator = "spammer", "other", "moderator"
+    tracks = [make_track(i, spammer if i % 3 else other) for i in range(9)]
+
+    for compact in (False, True):
+        player, sent = make_player(tracks, compact)
+        player.queue.get()
+
+        removed = run(player.remove_tracks_by_requester(spammer, requester=moderator))
+        # Indexes are positions in the full queue, history included, like remove_track reports them.
+        assert list(removed) == [1, 2, 4, 5, 7, 8]
+        assert [track.requester for track in player.queue.tracks()] == [other, other]
+        assert sent == [({
+            "op": "removeTrack",
+            "indexes": [1, 2, 4, 5, 7, 8],
+            "firstTrackId": tracks[1].track_id
+        }, moderator)]
+
+def test_remove_tracks_by_requester_without_tracks_sends_nothing(make_track):
+    player, sent = make_player([make_track(0, "other")])
+
+    assert run(player.remove_tracks_by_requester("spammer")) == {}
+    assert sent == []
@@ -0,0 +1,30 @@
+from voicelink.queue import FairQueue, FairRounds
+
+def requesters(queue):
+    return [track.requester for track in queue.tracks()]
+
+def test_fair_queue_puts_in_rounds(make_track):
+    queue = FairQueue(100, True, lambda key: key)
+    for i, requester in enumerate("aaabbc"):
+        queue.put(make_track(i, requester))
+
+    assert requesters(queue) == list("abcaba")
+
+def test_fair_queue_rebuilds_rounds_once_after_a_move(make_track, monkeypatch):
+    queue = FairQueue(100, True, lambda key: key)
+    for i, requester in enumerate("aabb"):
+        queue.put(make_track(i, requester))
+    queue.swap(1, 2)
+    assert requesters(queue) == list("baab")
+
+    builds = []
+    # Counts the rebuilds while still building the rounds the same way.
+    from_requesters = FairRounds.from_requesters.__func__
+    monkeypatch.setattr(FairRounds, "from_requesters", classmethod(lambda cls, r: builds.append(1) or from_requesters(cls, r)))
+
+    for i, requester in enumerate("ccc", start=4):
+        queue.put(make_track(i, requester))
+
+    # The moved tracks are not in round-robin order, so the rounds can't be rebuilt and puts fall back to the scan.
+    assert len(builds) == 1
+    assert requesters(queue) == list("bacabcc")
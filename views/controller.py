@@ -29,7 +29,7 @@ import views
 import function as func
 
 from discord.ext import commands
-from typing import Optional, Dict, Type, Union, Any
+from typing import Optional, Dict, Tuple, Type, Union, Any
 
 def key(interaction: discord.Interaction):
     return interaction.user
@@ -39,20 +39,34 @@ class ControlButton(discord.ui.Button):
         self,
         player: "voicelink.Player",
         btn_data: Dict[str, Any],
-        default_states: Optional[str] = None,
         **kwargs
     ):
-        super().__init__(**kwargs)
+        states, disabled = self.render_state(player)
+        super().__init__(disabled=disabled, **kwargs)
 
         self.player: voicelink.Player = player
         self.btn_data: Dict[str, Any] = btn_data
-        self.change_states(default_states)
+        self.change_states(states)
+
+    @classmethod
+    def render_state(cls, player: "voicelink.Player") -> Tuple[Optional[str], bool]:
+        """Returns the states and the disabled flag the button is created with."""
+        return None, False
+
+    @classmethod
+    def render_key(cls, player: "voicelink.Player", btn_data: Dict[str, Any]) -> tuple:
+        """Returns how the button renders for the player, without creating it."""
+        states, disabled = cls.render_state(player)
+        states = states.lower() if states else None
+        label = player._ph.replace(cls._get_button_config(btn_data, states).get("label"), {})
+        return states, disabled, label
 
-    def _get_button_config(self, states: Optional[str]) -> Dict[str, Any]:
+    @staticmethod
+    def _get_button_config(btn_data: Dict[str, Any], states: Optional[str]) -> Dict[str, Any]:
         """Retrieve button configuration based on states."""
-        if states and "states" in self.btn_data:
-            return self.btn_data["states"].get(states, {})
-        return self.btn_data
+        if states and "states" in btn_data:
+            return btn_data["states"].get(states, {})
+        return btn_data
 
     def _get_button_style(self, style_name: Optional[str]) -> discord.ButtonStyle:
         """Retrieve the corresponding ButtonStyle based on the provided style name."""
@@ -66,11 +80,15 @@ class ControlButton(discord.ui.Button):
     def change_states(self, states: str) -> None:
         """Change the button's emoji and label based on the provided state."""
         states = states.lower() if states else None
-        state_config = self._get_button_config(states)
+        state_config = self._get_button_config(self.btn_data, states)
         if state_config:
             self.emoji = state_config.get("emoji") or None
             self.style = self._get_button_style(state_config.get("style"))
             self.label = self.player._ph.replace(state_config.get("label"), {})
+
+        # A live view no longer matches the key it was rendered with.
+        if isinstance(self.view, InteractiveController):
+            self.view.rendered_key = None
     
     async def send(self, interaction: discord.Interaction, key: str, *params, view: discord.ui.View = None, ephemeral: bool = False) -> None:
         stay = self.player.settings.get("controller_msg", True)
@@ -82,11 +100,9 @@ class ControlButton(discord.ui.Button):
         )
 
 class Back(ControlButton):
-    def __init__(self, **kwargs):
-        super().__init__(
-            disabled=False if kwargs["player"].queue.history() or not kwargs["player"].current else True,
-            **kwargs
-        )
+    @classmethod
+    def render_state(cls, player: "voicelink.Player") -> Tuple[Optional[str], bool]:
+        return None, False if player.queue.history() or not player.current else True
     
     async def callback(self, interaction: discord.Interaction):
         if not self.player.is_privileged(interaction.user):
@@ -115,11 +131,11 @@ class PlayPause(ControlButton):
     def __init__(self, **kwargs):
         self.playing_status = lambda player, reverse=False: "pause" if (player.is_paused and not reverse) or (not player.is_paused and reverse) else "resume"
 
-        super().__init__(
-            default_states="pause",
-            disabled=kwargs["player"].current is None,
-            **kwargs
-        )
+        super().__init__(**kwargs)
+
+    @classmethod
+    def render_state(cls, player: "voicelink.Player") -> Tuple[Optional[str], bool]:
+        return "pause", player.current is None
     
     async def callback(self, interaction: discord.Interaction):
         is_paused = not self.player.is_paused
@@ -182,8 +198,9 @@ class Stop(ControlButton):
         await self.player.teardown()
 
 class AddFav(ControlButton):
-    def __init__(self, **kwargs):
-        super().__init__(disabled=kwargs["player"].current is None, **kwargs)
+    @classmethod
+    def render_state(cls, player: "voicelink.Player") -> Tuple[Optional[str], bool]:
+        return None, player.current is None
     
     async def callback(self, interaction: discord.Interaction):
         track = self.player.current
@@ -191,7 +208,7 @@ class AddFav(ControlButton):
             return await self.send(interaction, "noTrackPlaying")
         if track.is_stream:
             return await self.send(interaction, "playlistAddError")
-        user = await func.get_user(interaction.user.id, 'playlist')
+        user = await func.get_user(interaction.user.id, 'playlist', need_copy=False)
         rank, max_p, max_t = func.check_roles()
         if len(user['200']['tracks']) >= max_t:
             return await self.send(interaction, "playlistLimited", max_t, ephemeral=True)
@@ -205,11 +222,9 @@ class AddFav(ControlButton):
             await self.send(interaction, "playlistAddError2", ephemeral=True)
 
 class Loop(ControlButton):
-    def __init__(self, **kwargs):
-        super().__init__(
-            default_states=kwargs["player"].queue._repeat.peek_next().name,
-            **kwargs
-        )
+    @classmethod
+    def render_state(cls, player: "voicelink.Player") -> Tuple[Optional[str], bool]:
+        return player.queue._repeat.peek_next().name, False
     
     async def callback(self, interaction: discord.Interaction):
         if not self.player.is_privileged(interaction.user):
@@ -247,11 +262,9 @@ class VolumeDown(ControlButton):
         await self.send(interaction, 'setVolume', value, ephemeral=True)
 
 class VolumeMute(ControlButton):
-    def __init__(self, **kwargs):
-        super().__init__(
-            default_states="muted" if kwargs["player"].volume else "mute",
-            **kwargs
-        )
+    @classmethod
+    def render_state(cls, player: "voicelink.Player") -> Tuple[Optional[str], bool]:
+        return "muted" if player.volume else "mute", False
     
     async def callback(self, interaction: discord.Interaction):
         if not self.player.is_privileged(interaction.user):
@@ -297,11 +310,9 @@ class Shuffle(ControlButton):
         await self.send(interaction, 'shuffled')
 
 class Forward(ControlButton):
-    def __init__(self, **kwargs):
-        super().__init__(
-            disabled=kwargs["player"].current is None,
-            **kwargs
-        )
+    @classmethod
+    def render_state(cls, player: "voicelink.Player") -> Tuple[Optional[str], bool]:
+        return None, player.current is None
         
     async def callback(self, interaction: discord.Interaction):
         if not self.player.is_privileged(interaction.user):
@@ -316,11 +327,9 @@ class Forward(ControlButton):
         await self.send(interaction, 'forward', func.time(position))
 
 class Rewind(ControlButton):
-    def __init__(self, **kwargs):
-        super().__init__(
-            disabled=kwargs["player"].current is None,
-            **kwargs
-        )
+    @classmethod
+    def render_state(cls, player: "voicelink.Player") -> Tuple[Optional[str], bool]:
+        return None, player.current is None
         
     async def callback(self, interaction: discord.Interaction):
         if not self.player.is_privileged(interaction.user):
@@ -335,11 +344,9 @@ class Rewind(ControlButton):
         await self.send(interaction, 'rewind', func.time(position))
 
 class Lyrics(ControlButton):
-    def __init__(self, **kwargs):
-        super().__init__(
-            disabled=kwargs["player"].current is None,
-            **kwargs
-        )
+    @classmethod
+    def render_state(cls, player: "voicelink.Player") -> Tuple[Optional[str], bool]:
+        return None, player.current is None
         
     async def callback(self, interaction: discord.Interaction):
         if not self.player or not self.player.is_playing:
@@ -363,20 +370,30 @@ class Tracks(discord.ui.Select):
         
         if player.queue.is_empty:
             raise ValueError("Player queue is empty, cannot create Tracks row instance.")
-        
-        options = []
-        for index, track in enumerate(self.player.queue.tracks(), start=1):
-            if index > min(max(btn_data.get("max_options", 10), 1), 25):
-                break
-            options.append(discord.SelectOption(label=f"{index}. {track.title[:40]}", description=f"{track.author[:30]} · " + ("Live" if track.is_stream else track.formatted_length), emoji=track.emoji))
 
         super().__init__(
             placeholder=self.player._ph.replace(btn_data.get("label"), {}),
-            options=options,
+            options=[discord.SelectOption(label=label, description=description, emoji=emoji) for label, description, emoji in self._options(player, btn_data)],
             disabled=player.queue.is_empty,
             **kwargs
         )
     
+    @staticmethod
+    def _options(player: "voicelink.Player", btn_data: Dict[str, Any]) -> list:
+        options = []
+        for index, track in enumerate(player.queue.tracks(), start=1):
+            if index > min(max(btn_data.get("max_options", 10), 1), 25):
+                break
+            options.append((f"{index}. {track.title[:40]}", f"{track.author[:30]} · " + ("Live" if track.is_stream else track.formatted_length), track.emoji))
+        return options
+
+    @classmethod
+    def render_key(cls, player: "voicelink.Player", btn_data: Dict[str, Any]) -> Optional[tuple]:
+        """Returns how the select renders for the player, or None if it is left out."""
+        if player.queue.is_empty:
+            return None
+        return player._ph.replace(btn_data.get("label"), {}), tuple(cls._options(player, btn_data))
+
     async def callback(self, interaction: discord.Interaction):
         if not self.player.is_privileged(interaction.user):
             return await func.send(interaction, "missingFunctionPerm", ephemeral=True)
@@ -401,7 +418,12 @@ class Effects(discord.ui.Select):
             options=options,
             row=row
         )
-    
+
+    @classmethod
+    def render_key(cls, player: "voicelink.Player", btn_data: Dict[str, Any]) -> tuple:
+        """Returns how the select renders for the player, without creating it."""
+        return player._ph.replace(btn_data.get("label"), {}),
+
     async def callback(self, interaction: discord.Interaction):
         if not self.player.is_privileged(interaction.user):
             return await func.send(interaction, "missingFunctionPerm", ephemeral=True)
@@ -443,6 +465,8 @@ class InteractiveController(discord.ui.View):
         super().__init__(timeout=None)
 
         self.player: voicelink.Player = player
+        # The render_key the view was built for, None once a button changed its states.
+        self.rendered_key: Optional[tuple] = None
         for row_num, btn_row in enumerate(func.settings.controller.get("buttons")):
             for btn_name, btn_data in btn_row.items():
                 btn_class = BUTTON_TYPE.get(btn_name.lower())
@@ -455,6 +479,17 @@ class InteractiveController(discord.ui.View):
                     pass
                 
         self.cooldown = commands.CooldownMapping.from_cooldown(2.0, 10.0, key)
+
+    @staticmethod
+    def render_key(player: "voicelink.Player") -> tuple:
+        """Returns how a controller for the player renders, without building its components."""
+        items = []
+        for row_num, btn_row in enumerate(func.settings.controller.get("buttons")):
+            for btn_name, btn_data in btn_row.items():
+                btn_class = BUTTON_TYPE.get(btn_name.lower())
+                if btn_class and (key := btn_class.render_key(player, btn_data)) is not None:
+                    items.append((row_num, btn_name.lower(), key))
+        return tuple(items)
             
     async def interaction_check(self, interaction: discord.Interaction):
         if not self.player.node._available:
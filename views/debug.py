@@ -290,6 +290,7 @@ class NodesPanel(discord.ui.View):
                 
                 if node._available:
                     total_memory = node.stats.used + node.stats.free
+                    http_stats = node.http_stats
                     embed.add_field(
                         name=f"{name} Node - 🟢 Connected",
                         value=f"```• ADDRESS: {node._host}:{node._port}\n" \
@@ -297,6 +298,7 @@ class NodesPanel(discord.ui.View):
                             f"• CPU:     {node.stats.cpu_process_load:.1f}%\n" \
                             f"• RAM:     {func.format_bytes(node.stats.free)}/{func.format_bytes(total_memory, True)} ({(node.stats.free/total_memory) * 100:.1f}%)\n"
                             f"• LATENCY: {node.latency:.2f}ms\n" \
+                            f"• HTTP:    {http_stats['in_flight']}/{http_stats['limit_per_host']} (peak {http_stats['peak_in_flight']}, {http_stats['errors']}/{http_stats['requests']} failed)\n" \
                             f"• UPTIME:  {func.time(node.stats.uptime)}```"
                     )
                 else:
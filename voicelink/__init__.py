@@ -35,4 +35,5 @@ from .player import Player, connect_channel
 from .pool import *
 from .queue import *
 from .placeholders import Placeholders, build_embed
-from .transformer import encode, decode
+from .transformer import encode, decode, decode_many, DECODE_CACHE, ENCODE_CACHE
+from .utils import LRUCache, TTLCache, DecodeCache
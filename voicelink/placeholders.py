@@ -27,13 +27,139 @@ import re
 import function as func
 
 from discord import Embed, Client
+from functools import lru_cache
 
-from typing import TYPE_CHECKING
+from typing import Any, Callable, Dict, List, Mapping, Union, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .player import Player
     from .objects import Track
 
+CONDITION_REGEX = re.compile(r"\{\{(.*?)\}\}")
+VARIABLE_REGEX = re.compile(r"@@(.*?)@@")
+NUMBER_REGEX = re.compile(r"\d+")
+QUOTED_NUMBER_REGEX = re.compile(r"'(\d+)'")
+
+class LazyVariables(dict):
+    """Placeholder variables which are only evaluated when a template references them,
+       and at most once per render.
+    """
+    __slots__ = ("_variables",)
+
+    def __init__(self, variables: Mapping[str, Any]) -> None:
+        super().__init__()
+        self._variables: Mapping[str, Any] = variables
+
+    def __missing__(self, key: str) -> Any:
+        value = self._variables[key]
+        value = self[key] = value() if callable(value) else value
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+class _Scope(dict):
+    __slots__ = ("_variables",)
+
+    def __init__(self, variables: Mapping[str, Any], values: Dict[str, Any]) -> None:
+        super().__init__(values)
+        self._variables: Mapping[str, Any] = variables
+
+    def __missing__(self, key: str) -> Any:
+        return self._variables[key]
+
+Segment = Union[str, Callable[["Placeholders", Mapping[str, Any]], str]]
+
+def _substitute(text: str, variables: Mapping[str, Any]) -> str:
+    return VARIABLE_REGEX.sub(lambda m: str(variables.get(m.group(1), '')), text) if "@@" in text else text
+
+def _variable_segment(name: str) -> Segment:
+    if name.startswith("t_"):
+        key = name[2:]
+        return lambda placeholder, variables: _substitute(placeholder.translation(key), variables)
+    return lambda placeholder, variables: str(variables.get(name, ''))
+
+def _condition_segment(condition: str) -> Segment:
+    parts: list[str] = condition.split("??")
+    expression = parts[0].strip()
+    true_value, false_value = "", ""
+
+    # Split the true and false values
+    if "//" in parts[1]:
+        true_value, false_value = [part.strip() for part in parts[1].split("//")]
+    else:
+        true_value = parts[1].strip()
+
+    names: List[str] = []
+    def bind(match: re.Match) -> str:
+        names.append(match.group(1))
+        return f"_v{len(names) - 1}"
+
+    try:
+        # Quoted numbers are compared as numbers, the same as numeric variable values.
+        expression = QUOTED_NUMBER_REGEX.sub(lambda m: str(int(m.group(1))), VARIABLE_REGEX.sub(bind, expression))
+        code = compile(expression, "<placeholder>", "eval")
+    except SyntaxError:
+        return ""
+
+    true_template, false_template = Template(true_value, conditions=False), Template(false_value, conditions=False)
+
+    def render(placeholder: Placeholders, variables: Mapping[str, Any]) -> str:
+        try:
+            values = {}
+            for index, name in enumerate(names):
+                value = str(variables.get(name, ''))
+                values[f"_v{index}"] = int(value) if NUMBER_REGEX.fullmatch(value) else value
+
+            result = eval(code, {"__builtins__": None}, _Scope(variables, values))
+        except:
+            return ""
+
+        return (true_template if result else false_template).render(placeholder, variables)
+
+    return render
+
+class Template:
+    """A placeholder template compiled once into literal and callable segments.
+       It keeps the {{expression ?? true // false}}, @@variable@@ and @@t_key@@ syntax.
+    """
+    __slots__ = ("_segments",)
+
+    def __init__(self, text: str, *, conditions: bool = True) -> None:
+        segments: List[Segment] = []
+        position = 0
+        if conditions:
+            for match in CONDITION_REGEX.finditer(text):
+                self._compile_text(text[position:match.start()], segments)
+                segments.append(_condition_segment(match.group(1)))
+                position = match.end()
+
+        self._compile_text(text[position:], segments)
+        self._segments: tuple[Segment, ...] = tuple(segment for segment in segments if segment != "")
+
+    @staticmethod
+    def _compile_text(text: str, segments: List[Segment]) -> None:
+        position = 0
+        for match in VARIABLE_REGEX.finditer(text):
+            segments.append(text[position:match.start()])
+            segments.append(_variable_segment(match.group(1)))
+            position = match.end()
+        segments.append(text[position:])
+
+    def render(self, placeholder: Placeholders, variables: Mapping[str, Any]) -> str:
+        return "".join(
+            segment if segment.__class__ is str else segment(placeholder, variables)
+            for segment in self._segments
+        )
+
+@lru_cache(maxsize=1024)
+def compile_template(text: str) -> Template:
+    """Returns the compiled template of the text, compiling each distinct text only once."""
+    return Template(text)
+
 def ensure_track(func) -> callable:
     def wrapper(self: Placeholders, *args, **kwargs):
         current = self.get_current()
@@ -71,9 +197,6 @@ class Placeholders:
             "invite_link": f"https://discord.com/oauth2/authorize?client_id={self.bot.user.id}&permissions=2184260928&scope=bot%20applications.commands"
         }
 
-        self.regexes = {
-            "@@t_(.*?)@@": self.translation
-        }
         
     def get_current(self) -> Track:
         return self.player.current if self.player else None
@@ -160,47 +283,19 @@ class Placeholders:
     def translation(self, text: str) -> str:
         return self.player.get_msg(text)
         
-    def replace(self, text: str, variables: dict[str, str]) -> str:
-        if not text or text.isspace(): return
-
-        matches: list[str] = re.findall(r"\{\{(.*?)\}\}", text)
+    def lazy_variables(self) -> LazyVariables:
+        """Returns the variables, evaluated on first use by a template."""
+        return LazyVariables(self.variables)
 
-        for match in matches:
-            parts: list[str] = match.split("??")
-            expression = parts[0].strip()
-            true_value, false_value = "", ""
-
-            # Split the true and false values
-            if "//" in parts[1]:
-                true_value, false_value = [part.strip() for part in parts[1].split("//")]
-            else:
-                true_value = parts[1].strip()
-
-            try:
-                # Replace variable placeholders with their values
-                expression = re.sub(r'@@(.*?)@@', lambda x: "'" + variables.get(x.group(1), '') + "'", expression)
-                expression = re.sub(r"'(\d+)'", lambda x: str(int(x.group(1))), expression)
-                expression = re.sub(r"'(\d+)'\s*([><=!]+)\s*(\d+)", lambda x: f"{int(x.group(1))} {x.group(2)} {int(x.group(3))}", expression)
-
-                # Evaluate the expression
-                result = eval(expression, {"__builtins__": None}, variables)
-
-                # Replace the match with the true or false value based on the result
-                replacement = true_value if result else false_value
-                text = text.replace("{{" + match + "}}", replacement)
-
-            except:
-                text = text.replace("{{" + match + "}}", "")
+    def replace(self, text: str, variables: Mapping[str, Any]) -> str:
+        if not text or text.isspace(): return
 
-        for regex_pattern, func in self.regexes.items():
-            text = re.sub(regex_pattern, lambda m: func(m.group(1)), text)
-        text = re.sub(r'@@(.*?)@@', lambda x: str(variables.get(x.group(1), '')), text)
-        return text
+        return compile_template(text).render(self, variables)
     
 def build_embed(embed_form: dict[str, dict], placeholder: Placeholders) -> Embed:
     embed = Embed()
     try:
-        rv = {key: func() if callable(func) else func for key, func in placeholder.variables.items()}
+        rv = placeholder.lazy_variables()
         if author := embed_form.get("author"):
             embed.set_author(
                 name = placeholder.replace(author.get("name"), rv),
@@ -25,7 +25,7 @@ import time, logging
 import function as func
 
 from math import ceil
-from asyncio import sleep
+from asyncio import sleep, Task
 from views import InteractiveController
 from typing import Any, Dict, List, Optional, Union, Tuple
 
@@ -38,6 +38,8 @@ from discord import (
     Message,
     PartialMessage,
     Interaction,
+    RawMessageDeleteEvent,
+    RawBulkMessageDeleteEvent,
     errors,
     ChannelType
 )
@@ -45,7 +47,7 @@ from discord import (
 from discord.ext import commands
 
 from . import events
-from .enums import SearchType, LoopType, RequestMethod
+from .enums import SearchType, LoopType, RequestMethod, NodeAlgorithm
 from .events import VoicelinkEvent, TrackEndEvent, TrackStartEvent, TrackExceptionEvent
 from .exceptions import VoicelinkException, FilterInvalidArgument, TrackInvalidPosition, FilterTagAlreadyInUse, DuplicateTrack
 from .filters import Filter, Filters
@@ -55,6 +57,11 @@ from .placeholders import Placeholders, build_embed
 from .queue import Queue, QUEUE_TYPES
 from random import shuffle, choice
 
+CONTROLLER_DEBOUNCE = 0.5
+CONTROLLER_FRESH_MESSAGES = 5
+VOICE_STATUS_DEBOUNCE = 2.0
+VOICE_STATUS_MAX_BACKOFF = 300.0
+
 async def connect_channel(ctx: Union[commands.Context, Interaction], channel: VoiceChannel = None):
     texts = await func.get_lang(ctx.guild.id, "noChannel", "noPermission")
     try:
@@ -117,10 +124,10 @@ class Player(VoiceProtocol):
         self._volume: int = self.settings.get('volume', 100)
         self.queue: Queue = QUEUE_TYPES.get(self.settings.get("queue_type", "queue").lower())(
             self.settings.get("max_queue", func.settings.max_queue),
-            self.settings.get("duplicate_track", True), self.get_msg
+            self.settings.get("duplicate_track", True), self.get_msg, func.settings.compact_queue
         )
 
-        self._node = NodePool.get_node()
+        self._node = NodePool.get_best_node(algorithm=NodeAlgorithm.BY_LOAD)
         self._current: Optional[Track] = None
         self._filters: Filters = Filters()
         self._paused: bool = False
@@ -136,7 +143,16 @@ class Player(VoiceProtocol):
         self._voice_state: dict = {}
 
         self.controller: Union[Message, PartialMessage] = None
-        self._updating: bool = False
+        self._controller_view: Optional[InteractiveController] = None
+        self._controller_task: Optional[Task] = None
+        self._controller_pending: bool = False
+        self._messages_after_controller: int = 0
+
+        self._voice_status_sent: Optional[Tuple[int, Optional[str]]] = None
+        self._voice_status_task: Optional[Task] = None
+        self._voice_status_pending: bool = False
+        self._voice_status_backoff: float = 0.0
+        self._voice_status_retry_at: float = 0.0
 
         self.pause_votes = set()
         self.resume_votes = set()
@@ -309,7 +325,7 @@ class Player(VoiceProtocol):
         
         return build_embed(embed_form, self._ph)
 
-    async def send(self, method: RequestMethod, query: str = None, data: Union[Dict, str] = {}) -> Dict:
+    async def send(self, method: RequestMethod, query: str = None, data: Union[Dict, str] = None) -> Dict:
         """Sends an HTTP request to the node with the given method, query, and data."""
         uri: str = f"sessions/{self._node._session_id}/players/{self._guild.id}" + (f"?{query}" if query else "")
         return await self._node.send(method, query=uri, data=data)
@@ -321,14 +337,15 @@ class Player(VoiceProtocol):
         self._is_connected = state.get("connected")
         self._last_position = state.get("position")
         self._ping = state.get("ping")
-        self._logger.debug(f"Player in {self.guild.name}({self.guild.id}) update state with data {data}")
+        self._logger.debug("Player in %s(%s) update state with data %s", self.guild.name, self.guild.id, data)
 
         if self.is_ipc_connected:
-            await self.send_ws({
+            self._ipc.queue_player_update({
                 "op": "playerUpdate",
                 "lastUpdate": self._last_update,
                 "isConnected": self._is_connected,
-                "lastPosition": self._last_position
+                "lastPosition": self._last_position,
+                "guildId": str(self.guild.id)
             })
 
     async def _dispatch_voice_update(self, voice_data: Dict[str, Any] = None):
@@ -426,7 +443,7 @@ class Player(VoiceProtocol):
             if not track.requester.bot:
                 self._bot.loop.create_task(func.update_user(track.requester.id, {
                     "$push": {"history": {"$each": [track.track_id], "$slice": -25}}
-                }))
+                }, buffered=True))
 
         await self.invoke_controller()
         await self.update_voice_status()
@@ -440,17 +457,37 @@ class Player(VoiceProtocol):
             })
 
     async def invoke_controller(self):
-        """Sends or updates the music controller message in the designated channel."""
-        if not self.settings.get('controller', True):
+        """Schedules an update of the music controller message in the designated channel.
+           Requests made while an update is pending or running are coalesced into one render of the latest state.
+        """
+        if not self.settings.get('controller', True) or not self.channel:
             return
-        
-        if self._updating or not self.channel:
+
+        self._controller_pending = True
+        if not self._controller_task or self._controller_task.done():
+            self._controller_task = self._bot.loop.create_task(self._run_controller_renders())
+
+    async def _run_controller_renders(self):
+        while self._controller_pending:
+            await sleep(CONTROLLER_DEBOUNCE)
+            self._controller_pending = False
+            await self._render_controller()
+
+    async def _render_controller(self):
+        """Sends or updates the music controller message, reusing the current view if its components are unchanged."""
+        # The controller may have been turned off while the render was debounced.
+        if not self.settings.get('controller', True) or not self.channel:
             return
-        
-        self._updating = True
 
-        try:            
-            embed, view = self.build_embed(self.current), InteractiveController(self)
+        try:
+            embed, key = self.build_embed(self.current), InteractiveController.render_key(self)
+            view_changed = self._controller_view is None or key != self._controller_view.rendered_key
+            if view_changed:
+                view = InteractiveController(self)
+                view.rendered_key = key
+            else:
+                view = self._controller_view
+
             if not self.controller:
                 if request_channel_data := self.settings.get("music_request_channel"):
                     channel = self.bot.get_channel(request_channel_data.get("text_channel_id"))
@@ -465,41 +502,70 @@ class Player(VoiceProtocol):
                 if not self.controller:
                     self.controller = await func.send(self.context, content=embed, view=view, requires_fetch=True)
 
+                self._messages_after_controller = 0
+
             elif not await self.is_position_fresh():
                 await self.controller.delete()
                 self.controller = await func.send(self.context, content=embed, view=view, requires_fetch=True)
+                self._messages_after_controller = 0
 
-            else:
+            elif view_changed:
                 await self.controller.edit(embed=embed, view=view)
-        
+
+            else:
+                await self.controller.edit(embed=embed)
+
+            self._controller_view = view
+
         except errors.Forbidden:
             self._logger.warning(f"Missing permission to update the music controller on {self.guild.name}({self.guild.id})")
 
         except Exception as e:
             self._logger.error(f"Something went wrong while sending music controller to {self.guild.name}({self.guild.id})", exc_info=e)
-        
-        finally:
-            self._updating = False
 
-    async def is_position_fresh(self):
-        """Checks if the current controller message is among the most recent messages."""
-        try:
-            async for message in self.context.channel.history(limit=5):
-                if message.id == self.controller.id:
-                    return True
-        except:
-            pass
+    def _is_request_channel_controller(self) -> bool:
+        return bool(self.controller) and self.controller.id == self.settings.get("music_request_channel", {}).get("controller_msg_id")
 
-        return False
+    def _counts_after_controller(self, channel_id: int, message_id: int) -> bool:
+        return (
+            self.controller is not None
+            and channel_id == self.controller.channel.id
+            and message_id > self.controller.id
+            and not self._is_request_channel_controller()
+        )
+
+    def track_channel_message(self, message: Message) -> None:
+        """Counts the messages sent after the controller message in its channel."""
+        if self._counts_after_controller(message.channel.id, message.id):
+            self._messages_after_controller += 1
+
+    def track_channel_message_delete(self, payload: Union[RawMessageDeleteEvent, RawBulkMessageDeleteEvent]) -> None:
+        """Uncounts deleted messages which were sent after the controller message."""
+        message_ids = payload.message_ids if isinstance(payload, RawBulkMessageDeleteEvent) else (payload.message_id,)
+        deleted = sum(1 for message_id in message_ids if self._counts_after_controller(payload.channel_id, message_id))
+        if deleted:
+            self._messages_after_controller = max(self._messages_after_controller - deleted, 0)
+
+    async def is_position_fresh(self):
+        """Checks if the current controller message is among the most recent messages.
+           The persistent controller of the music request channel is always fresh.
+        """
+        if self._is_request_channel_controller():
+            return True
+        return self._messages_after_controller < CONTROLLER_FRESH_MESSAGES
     
     async def teardown(self):
         """Cleans up the player and associated resources."""
+        if self._controller_task:
+            self._controller_task.cancel()
+
         try:
             await func.update_settings(self.guild.id, {"$set": {
                 "last_active": (timeNow := round(time.time())), 
                 "played_time": round(self.settings.get("played_time", 0) + ((timeNow - self.joinTime) / 60), 2)
             }})
             
+            self._ipc.forget_player(self.guild.id)
             if self.is_ipc_connected:
                 await self.send_ws({"op": "playerClose"})
         except:
@@ -507,7 +573,7 @@ class Player(VoiceProtocol):
 
         try:
             await self.update_voice_status(remove_status=True)
-            if self.controller and self.controller.id == self.settings.get("music_request_channel", {}).get("controller_msg_id"):
+            if self._is_request_channel_controller():
                 await self.controller.edit(embed=self.build_embed(), view=None)
             else:    
                 await self.controller.delete()
@@ -621,21 +687,20 @@ class Player(VoiceProtocol):
     async def add_track(self, raw_tracks: Union[Track, List[Track]], *, start_time: int = 0, end_time: int = 0, at_front: bool = False, duplicate: bool = True) -> int:
         """Adds one or more tracks to the queue."""
         tracks: List[Track] = []
-        _duplicate_tracks = [] if self.queue._allow_duplicate and duplicate else [track.uri for track in self.queue._queue]
+        check_duplicate = not (self.queue._allow_duplicate and duplicate)
         raw_tracks = raw_tracks[0] if isinstance(raw_tracks, List) and len(raw_tracks) == 1 else raw_tracks
 
         try:
             if (is_list := isinstance(raw_tracks, List)):
                 for track in raw_tracks:
-                    if track.uri in _duplicate_tracks:
+                    if check_duplicate and self.queue.is_duplicate(track):
                         continue
 
                     self._validate_time(track, start_time, end_time)
                     self.queue.put_at_front(track) if at_front else self.queue.put(track)  
                     tracks.append(track)
-                    _duplicate_tracks.append(track.uri)
             else:
-                if raw_tracks.uri in _duplicate_tracks:
+                if check_duplicate and self.queue.is_duplicate(raw_tracks):
                     raise DuplicateTrack(self.get_msg("voicelinkDuplicateTrack"))
                 
                 self._validate_time(raw_tracks, start_time, end_time)
@@ -661,6 +726,18 @@ class Player(VoiceProtocol):
             }, requester=requester)
 
         return removed_tracks
+
+    async def remove_tracks_by_requester(self, member: Member, requester: Member = None) -> Dict[int, Track]:
+        """Removes every upcoming track requested by the member from the queue."""
+        removed_tracks = self.queue.remove_by_requester(member)
+        if removed_tracks and self.is_ipc_connected:
+            await self.send_ws({
+                "op": "removeTrack",
+                "indexes": list(removed_tracks.keys()),
+                "firstTrackId": next(iter(removed_tracks.values())).track_id
+            }, requester=requester)
+
+        return removed_tracks
     
     async def seek(self, position: float, requester: Member = None) -> float:
         """Seeks to a position in the currently playing track milliseconds"""
@@ -703,7 +780,7 @@ class Player(VoiceProtocol):
 
     async def shuffle(self, queue_type: str, requester: Member = None) -> None:
         """Shuffles the tracks in the specified queue or history."""
-        replacement = self.queue.tracks() if queue_type == "queue" else self.queue.history()
+        replacement = list(self.queue.tracks() if queue_type == "queue" else self.queue.history())
         if len(replacement) < 3:
             raise VoicelinkException(self.get_msg('shuffleError'))
         
@@ -863,17 +940,60 @@ class Player(VoiceProtocol):
         return False
     
     async def update_voice_status(self, remove_status: bool = False) -> None:
-        """Updates the voice status of the channel based on the specified template."""
+        """Updates the voice status of the channel based on the specified template.
+           Updates are debounced to the latest state and skipped when the status is unchanged,
+           while removing the status happens right away.
+        """
         template = self.settings.get("stage_announce_template", func.settings.voice_status_template)
         if not template or not self.channel:
             return
-        
+
+        if remove_status:
+            if self._voice_status_task:
+                self._voice_status_task.cancel()
+            await self._apply_voice_status(None)
+            return
+
+        self._voice_status_pending = True
+        if not self._voice_status_task or self._voice_status_task.done():
+            self._voice_status_task = self._bot.loop.create_task(self._run_voice_status_updates())
+
+    async def _run_voice_status_updates(self) -> None:
+        while self._voice_status_pending:
+            await sleep(max(VOICE_STATUS_DEBOUNCE, self._voice_status_retry_at - time.time()))
+            self._voice_status_pending = False
+
+            template = self.settings.get("stage_announce_template", func.settings.voice_status_template)
+            if not template or not self.channel:
+                return
+
+            try:
+                status = self._ph.replace(text=template, variables=self._ph.lazy_variables())
+            except Exception as e:
+                self._logger.error(f"Failed to render the voice status template for guild {self.guild.name}({self.guild.id})", exc_info=e)
+                continue
+
+            if not await self._apply_voice_status(status):
+                # Rate limited, retry the latest state once the backoff has passed.
+                self._voice_status_pending = True
+
+    async def _apply_voice_status(self, status: Optional[str]) -> bool:
+        """Sends the status unless it was the last one sent to this channel. Returns False when rate limited."""
+        if self.channel.type != ChannelType.voice or self._voice_status_sent == (self.channel.id, status):
+            return True
+
         try:
-            rv = {key: func() if callable(func) else func for key, func in self._ph.variables.items()}
-            status = None if remove_status else self._ph.replace(text=template, variables=rv)
-            # if self.channel.status != status:
-            if self.channel.type == ChannelType.voice:
-                await self.channel.edit(status=status)
+            await self.channel.edit(status=status)
+
+        except (errors.RateLimited, errors.HTTPException) as e:
+            if isinstance(e, errors.HTTPException) and e.status != 429:
+                self._logger.error(f"Failed to update voice status in channel '{self.channel.name}' ({self.channel.id})", exc_info=e)
+                return True
+
+            self._voice_status_backoff = min(max(self._voice_status_backoff * 2, getattr(e, "retry_after", 0), VOICE_STATUS_DEBOUNCE), VOICE_STATUS_MAX_BACKOFF)
+            self._voice_status_retry_at = time.time() + self._voice_status_backoff
+            self._logger.warning(f"Voice status of channel '{self.channel.name}' ({self.channel.id}) is rate limited, retrying in {self._voice_status_backoff:.0f}s")
+            return False
 
         except Exception as e:
             self._logger.error(
@@ -882,6 +1002,11 @@ class Player(VoiceProtocol):
                 f"({self.channel.guild.id})", 
                 exc_info=e
             )
+            return True
+
+        self._voice_status_sent = (self.channel.id, status)
+        self._voice_status_backoff = 0.0
+        return True
 
     async def send_ws(self, payload, requester: Member = None):
         """Sends a WebSocket payload to the bot's IPC (Inter-Process Communication) system."""
@@ -29,11 +29,17 @@ import re
 import aiohttp
 import logging
 
+from collections import deque
 from discord import Client, Member
 from discord.ext.commands import Bot
-from typing import Dict, Optional, Union, List, Any, TYPE_CHECKING
+from typing import Dict, Optional, Union, List, Any, Mapping, Tuple, TYPE_CHECKING
 from urllib.parse import quote
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 from . import (
     __version__
 )
@@ -48,7 +54,9 @@ from .exceptions import (
     TrackLoadError
 )
 from .objects import Playlist, Track
-from .utils import ExponentialBackoff, NodeStats, NodeInfo, Ping
+from .queue import COMPACT_SOURCES
+from .transformer import decode
+from .utils import ExponentialBackoff, NodeStats, NodeInfo, Ping, TokenBucket, SingleFlight, TTLCache
 from .enums import RequestMethod
 from .ratelimit import YTRatelimit, YTToken, STRATEGY
 
@@ -60,6 +68,38 @@ URL_REGEX = re.compile(
 )
 
 NODE_VERSION = "v4"
+LATENCY_INTERVAL = 30
+LATENCY_SMOOTHING = 0.3
+READY_TIMEOUT = 10
+BODY_METHODS = (RequestMethod.PATCH, RequestMethod.POST)
+SEARCH_PREFIXES = frozenset(search_type.value for search_type in SearchType)
+SEARCH_CACHE_TTL = {
+    "url": 3600,
+    "search": 600,
+    "empty": 60
+}
+SEARCH_CACHE: TTLCache = TTLCache(maxsize=2048, ttl=SEARCH_CACHE_TTL["search"])
+DECODE_CHUNK_SIZE = 100
+DEFAULT_RECOVERY_RATE = 5.0
+DECODE_CONCURRENCY = 4
+DEFAULT_HTTP_SETTINGS = {
+    "limit": 100,
+    "limit_per_host": 30,
+    "keepalive_timeout": 30,
+    "ttl_dns_cache": 300,
+    "timeout": None, # No total limit, large playlists can take a while to load.
+    "connect_timeout": 5
+}
+
+def normalize_query(query: str) -> Tuple[str, bool]:
+    """Returns the search cache key of a loadtracks identifier and whether it is a search.
+       Search terms are case and whitespace insensitive, anything else is kept as is.
+    """
+    prefix, _, term = query.partition(":")
+    if prefix in SEARCH_PREFIXES and not URL_REGEX.match(query):
+        return f"{prefix}:{' '.join(term.lower().split())}", True
+
+    return query.strip(), False
 
 class Node:
     """The base class for a node. 
@@ -78,8 +118,11 @@ class Node:
         secure: bool = False,
         heartbeat: int = 30,
         yt_ratelimit: dict = None,
+        recovery: dict = None,
+        http: dict = None,
         session: Optional[aiohttp.ClientSession] = None,
         resume_key: Optional[str] = None,
+        resume_timeout: int = 60,
         logger: Optional[logging.Logger] = None
     ):
         self._bot: Bot = bot
@@ -95,23 +138,45 @@ class Node:
         self._websocket_uri: str = f"{'wss' if self._secure else 'ws'}://{self._host}:{self._port}/" + NODE_VERSION + "/websocket"
         self._rest_uri: str = f"{'https' if self._secure else 'http'}://{self._host}:{self._port}"
 
-        self._session: aiohttp.ClientSession = session or aiohttp.ClientSession()
+        self._http_settings: Dict[str, Optional[Union[int, float]]] = {**DEFAULT_HTTP_SETTINGS, **(http or {})}
+        self._session: aiohttp.ClientSession = session or self._create_session()
+        self._rest_headers: Dict[str, str] = {"Authorization": self._password}
+        self._requests: int = 0
+        self._request_errors: int = 0
+        self._in_flight: int = 0
+        self._peak_in_flight: int = 0
+        self._inflight: SingleFlight = SingleFlight()
+        self._guild_payloads: Dict[int, deque] = {}
         self._websocket: aiohttp.ClientWebSocketResponse = None
         self._task: asyncio.Task = None
 
+        # Kept for backwards compatibility, Lavalink v4 resumes by session id instead.
         self.resume_key: str = resume_key or str(os.urandom(8).hex())
+        self.resume_timeout: int = resume_timeout
         self._session_id: str = None
+        self._resumed: bool = False
         self._available: bool = None
+        self._ready: asyncio.Event = asyncio.Event()
+
+        recovery = recovery or {}
+        self._recovery_concurrency: int = max(recovery.get("concurrency", 5), 1)
+        self._recovery_rate: float = recovery.get("rate", DEFAULT_RECOVERY_RATE)
+        if not self._recovery_rate or self._recovery_rate <= 0:
+            self._logger.warning(f"Invalid recovery rate {self._recovery_rate!r} for node [{self._identifier}], using {DEFAULT_RECOVERY_RATE}.")
+            self._recovery_rate = DEFAULT_RECOVERY_RATE
 
         self._headers: Dict[str, str] = {
             "Authorization": self._password,
             "User-Id": str(bot.user.id),
-            "Client-Name": f"Voicelink/{__version__}",
-            'Resume-Key': self.resume_key
+            "Client-Name": f"Voicelink/{__version__}"
         }
 
         self._players: Dict[int, Player] = {}
         self._info: Optional[NodeInfo] = None
+        self._stats: Optional[NodeStats] = None
+
+        self._latency: Optional[float] = None
+        self._latency_task: asyncio.Task = None
         
         self.yt_ratelimit: Optional[YTRatelimit] = STRATEGY.get(yt_ratelimit.get("strategy"))(self, yt_ratelimit) if yt_ratelimit and yt_ratelimit.get("tokens") else None
 
@@ -138,6 +203,24 @@ class Node:
         """Property which returns the node stats."""
         return self._stats
 
+    @property
+    def http_stats(self) -> Dict[str, int]:
+        """Property which returns the REST connection pool utilisation of the node"""
+        connector = self._session.connector
+        return {
+            "limit": connector.limit if connector else 0,
+            "limit_per_host": connector.limit_per_host if connector else 0,
+            "in_flight": self._in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            "requests": self._requests,
+            "errors": self._request_errors
+        }
+
+    @property
+    def penalty(self) -> float:
+        """Property which returns the load penalty of the node, falling back to the player count until stats arrive."""
+        return self._stats.penalty if self._stats else float(len(self._players))
+
     @property
     def players(self) -> Dict[int, Player]:
         """Property which returns a dict containing the guild ID and the player object."""
@@ -160,8 +243,23 @@ class Node:
 
     @property
     def latency(self) -> float:
-        """Property which returns the latency of the node"""
-        return Ping(self._host, port=self._port).get_ping()
+        """Property which returns the smoothed latency of the node"""
+        return self._latency if self._latency is not None else float("inf")
+
+    async def _sample_latency(self) -> None:
+        sample = await Ping(self._host, port=self._port).get_ping_async()
+        if self._latency is None:
+            self._latency = sample
+        else:
+            self._latency = LATENCY_SMOOTHING * sample + (1 - LATENCY_SMOOTHING) * self._latency
+
+    async def _latency_loop(self) -> None:
+        while True:
+            await asyncio.sleep(LATENCY_INTERVAL)
+            try:
+                await self._sample_latency()
+            except Exception as e:
+                self._logger.debug(f"Latency probe failed for node [{self._identifier}]: {e}")
 
     async def _update_handler(self, data: dict) -> None:
         await self._bot.wait_until_ready()
@@ -204,7 +302,7 @@ class Node:
                     self._logger.error(f"WebSocket error for node [{self._identifier}]")
                     break
                 
-                self._bot.loop.create_task(self._handle_payload(msg.json()))
+                self._dispatch_payload(json_loads(msg.data))
 
             except aiohttp.ClientConnectionError as e:
                 self._logger.error(f"Connection error: {e}")
@@ -225,6 +323,40 @@ class Node:
             except Exception as e:
                 self._logger.error(f"Reconnection failed: {e}")
 
+    def _dispatch_payload(self, data: dict) -> None:
+        """Routes a websocket payload without spawning a task per frame.
+           Stats are applied inline, and payloads for a guild are handled
+           one after another by a single drain task, so their order is kept.
+        """
+        op = data.get("op", None)
+        if op == "stats":
+            self._stats = NodeStats(data)
+            return
+
+        if "guildId" not in data:
+            self._bot.loop.create_task(self._handle_payload(data))
+            return
+
+        guild_id = int(data["guildId"])
+        if (payloads := self._guild_payloads.get(guild_id)) is not None:
+            payloads.append(data)
+            return
+
+        self._guild_payloads[guild_id] = deque((data,))
+        self._bot.loop.create_task(self._drain_guild_payloads(guild_id))
+
+    async def _drain_guild_payloads(self, guild_id: int) -> None:
+        payloads = self._guild_payloads[guild_id]
+        try:
+            while payloads:
+                data = payloads.popleft()
+                try:
+                    await self._handle_payload(data)
+                except Exception as e:
+                    self._logger.exception(f"Error while handling {data.get('op')} for guild [{guild_id}]: {e}")
+        finally:
+            del self._guild_payloads[guild_id]
+
     async def _handle_payload(self, data: dict) -> None:
         op = data.get("op", None)
         if not op:
@@ -232,9 +364,12 @@ class Node:
 
         if op == "ready":
             self._session_id = data.get("sessionId")
-
-        if op == "stats":
-            self._stats = NodeStats(data)
+            self._resumed = data.get("resumed", False)
+            try:
+                if not self._resumed:
+                    await self._configure_resuming()
+            finally:
+                self._ready.set()
             return
 
         if "guildId" in data:
@@ -246,24 +381,58 @@ class Node:
         elif op == "playerUpdate":
             await player._update_state(data)
 
-    async def send(self, method: RequestMethod, query: str, data: Union[dict, str] = {}) -> dict:
+    async def _configure_resuming(self) -> None:
+        try:
+            await self.send(
+                RequestMethod.PATCH, query=f"sessions/{self._session_id}",
+                data={"resuming": True, "timeout": self.resume_timeout}
+            )
+        except Exception as e:
+            self._logger.warning(f"Unable to enable session resuming for node [{self._identifier}]: {e}")
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        settings = self._http_settings
+        connector = aiohttp.TCPConnector(
+            limit=settings["limit"],
+            limit_per_host=settings["limit_per_host"],
+            keepalive_timeout=settings["keepalive_timeout"],
+            ttl_dns_cache=settings["ttl_dns_cache"]
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=settings["timeout"],
+            connect=settings["connect_timeout"],
+            sock_connect=settings["connect_timeout"]
+        )
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def send(self, method: RequestMethod, query: str, data: Union[dict, str] = None) -> dict:
         if not self._available:
             raise NodeNotAvailable(f"The node '{self._identifier}' is unavailable.")
         
         uri: str = f"{self._rest_uri}/{NODE_VERSION}/{query}"
-        async with self._session.request(
-            method=method.value,
-            url=uri,
-            headers={"Authorization": self._password},
-            json=data
-        ) as resp:
-            if resp.status >= 300:
-                raise NodeException(f"Getting errors from Lavalink REST api")
-            
-            if method == RequestMethod.DELETE:
-                return await resp.json(content_type=None)
+        self._requests += 1
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        try:
+            async with self._session.request(
+                method=method.value,
+                url=uri,
+                headers=self._rest_headers,
+                json=data if method in BODY_METHODS else None
+            ) as resp:
+                if resp.status >= 300:
+                    self._request_errors += 1
+                    raise NodeException(f"Getting errors from Lavalink REST api")
+                
+                if method == RequestMethod.DELETE:
+                    return await resp.json(content_type=None)
 
-            return await resp.json()
+                return await resp.json()
+        except asyncio.TimeoutError:
+            self._request_errors += 1
+            raise NodeException(f"Request to Lavalink REST api timed out on node [{self._identifier}]")
+        finally:
+            self._in_flight -= 1
 
     async def connect(self) -> Node:
         """Initiates a connection with a Lavalink node and adds it to the node pool."""
@@ -273,13 +442,23 @@ class Node:
                 self._logger.info(f"Node [{self._identifier}] already connected.")
                 return
             
+            headers = self._headers
+            if self._session_id:
+                headers = {**headers, "Session-Id": self._session_id}
+
+            self._ready.clear()
+            self._resumed = False
             self._websocket = await self._session.ws_connect(
-                self._websocket_uri, headers=self._headers, heartbeat=self._heartbeat
+                self._websocket_uri, headers=headers, heartbeat=self._heartbeat
             )
 
             self._task = self._bot.loop.create_task(self._listen())
             self._available = True
             self._info = NodeInfo(await self.send(RequestMethod.GET, query="info"))
+
+            await self._sample_latency()
+            if not self._latency_task or self._latency_task.done():
+                self._latency_task = self._bot.loop.create_task(self._latency_loop())
             
             self._logger.info(f"Node [{self._identifier}] is connected!")
         
@@ -297,7 +476,15 @@ class Node:
             )
         
         if self.players:
-            await self.reconnect()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=READY_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+
+            if self._resumed:
+                self._logger.info(f"Node [{self._identifier}] resumed its session with {len(self.players)} players.")
+            else:
+                await self.reconnect()
 
         return self
               
@@ -312,26 +499,61 @@ class Node:
         if remove_from_pool:
             del self._pool._nodes[self._identifier]
         self._available = False
+        self._session_id = None
         self._task.cancel()
+        if self._latency_task:
+            self._latency_task.cancel()
         
         self._logger.info(f"Node [{self._identifier}] is disconnected!")
 
+    @staticmethod
+    def _recovery_priority(player: Player) -> tuple:
+        has_listeners = player.channel is not None and any(not member.bot for member in player.channel.members)
+        return (not has_listeners, player.current is None)
+
+    async def _recover_player(self, player: Player, semaphore: asyncio.Semaphore, bucket: TokenBucket) -> None:
+        async with semaphore:
+            await bucket.acquire()
+            if player._voice_state:
+                await player._dispatch_voice_update(player._voice_state)
+
+            if player.current:
+                await player.play(track=player.current, start=min(player._last_position, player.current.length))
+
+                if player.is_paused:
+                    await player.set_pause(True)
+
     async def reconnect(self) -> None:
-        await asyncio.sleep(10)
-        for player in self.players.copy().values():
-            await asyncio.sleep(3)
+        """Restores the players of this node concurrently, bounded by the recovery
+           concurrency and rate. Players with listeners and a current track go first.
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=READY_TIMEOUT)
+        except asyncio.TimeoutError:
+            self._logger.warning(f"Node [{self._identifier}] did not report ready, recovering players anyway.")
+
+        players = sorted(self.players.values(), key=self._recovery_priority)
+        total, recovered, failed = len(players), 0, 0
+        semaphore = asyncio.Semaphore(self._recovery_concurrency)
+        bucket = TokenBucket(rate=self._recovery_rate, capacity=self._recovery_concurrency)
+        self._logger.info(f"Recovering {total} players on node [{self._identifier}]")
+
+        async def recover(player: Player) -> None:
+            nonlocal recovered, failed
             try:
-                if player._voice_state:
-                    await player._dispatch_voice_update(player._voice_state)
+                await self._recover_player(player, semaphore, bucket)
+                recovered += 1
+            except Exception as e:
+                failed += 1
+                self._logger.error(f"Failed to recover the player in guild [{player.guild.id}] on node [{self._identifier}]: {e}")
+                await player.teardown()
 
-                if player.current:
-                    await player.play(track=player.current, start=min(player._last_position, player.current.length))
+            done = recovered + failed
+            if done % 25 == 0 and done != total:
+                self._logger.info(f"Recovery progress on node [{self._identifier}]: {done}/{total}")
 
-                    if player.is_paused:
-                        await player.set_pause(True)
-            except:
-                await player.teardown()
-            await asyncio.sleep(2)
+        await asyncio.gather(*(recover(player) for player in players))
+        self._logger.info(f"Recovered {recovered}/{total} players on node [{self._identifier}] ({failed} failed)")
 
     async def build_track(
         self,
@@ -345,9 +567,79 @@ class Node:
         Context object on the track it builds.
         """
 
-        data = await self.send(RequestMethod.GET, f"decodetrack?encodedTrack={identifier}")
+        data = await self._inflight.do(
+            ("decodetrack", identifier),
+            lambda: self.send(RequestMethod.GET, f"decodetrack?encodedTrack={identifier}")
+        )
         return Track(track_id=identifier, info=data, requester=requester)
 
+    async def decode_tracks(self, identifiers: List[str]) -> List[Optional[Mapping[str, Any]]]:
+        """
+        Decodes a batch of encoded tracks, keeping their order.
+
+        Tracks from known sources are decoded locally, the rest are resolved in
+        chunks through the node's decodetracks endpoint, falling back to the local
+        result if the node can't decode them. Undecodable tracks are returned as None.
+        """
+        infos: List[Optional[Mapping[str, Any]]] = [None] * len(identifiers)
+        remote: List[int] = []
+        for index, identifier in enumerate(identifiers):
+            try:
+                infos[index] = decode(identifier)
+            except Exception:
+                remote.append(index)
+                continue
+
+            if infos[index].get("sourceName") not in COMPACT_SOURCES:
+                remote.append(index)
+
+        semaphore = asyncio.Semaphore(DECODE_CONCURRENCY)
+
+        async def decode_chunk(indexes: List[int]) -> None:
+            async with semaphore:
+                try:
+                    data = await self.send(RequestMethod.POST, "decodetracks", data=[identifiers[index] for index in indexes])
+                except Exception as e:
+                    self._logger.warning(f"Bulk decode of {len(indexes)} tracks failed on node [{self._identifier}]: {e}")
+                    return
+
+            for index, track in zip(indexes, data):
+                infos[index] = track["info"]
+
+        await asyncio.gather(*(
+            decode_chunk(remote[i:i + DECODE_CHUNK_SIZE]) for i in range(0, len(remote), DECODE_CHUNK_SIZE)
+        ))
+        return infos
+
+    async def build_tracks(
+        self,
+        identifiers: List[str],
+        requester: Member = None
+    ) -> List[Track]:
+        """
+        Builds tracks from a batch of valid track identifiers in a handful of requests.
+        Identifiers which can't be decoded are left out.
+        """
+        infos = await self.decode_tracks(identifiers)
+        return [
+            Track(track_id=identifier, info=info, requester=requester)
+            for identifier, info in zip(identifiers, infos) if info is not None
+        ]
+
+    async def _load_tracks(self, query: str, cache_key: str, is_search: bool) -> Tuple[str, Any]:
+        response: dict[str, Any] = await self.send(RequestMethod.GET, f"loadtracks?identifier={quote(query)}")
+        data = response.get("data")
+        load_type = response.get("loadType")
+
+        if not load_type:
+            raise TrackLoadError("There was an error while trying to load this track.")
+
+        elif load_type == "error":
+            raise TrackLoadError(f"{data['message']} [{data['severity']}]")
+
+        ttl = SEARCH_CACHE_TTL["empty" if load_type == "empty" else "search" if is_search else "url"]
+        return SEARCH_CACHE.put(cache_key, (load_type, data), ttl=ttl)
+
     async def get_tracks(
         self,
         query: str,
@@ -365,19 +657,19 @@ class Node:
         if not URL_REGEX.match(query) and ':' not in query:
             query = f"{search_type}:{query}"
 
-        response: dict[str, Any] = await self.send(RequestMethod.GET, f"loadtracks?identifier={quote(query)}")
-        data = response.get("data")
-        load_type = response.get("loadType")
+        cache_key, is_search = normalize_query(query)
+        if not (cached := SEARCH_CACHE.get(cache_key)):
+            # Concurrent callers for the same query share a single loadtracks request.
+            cached = await self._inflight.do(
+                ("loadtracks", cache_key),
+                lambda: self._load_tracks(query, cache_key, is_search)
+            )
 
-        if not load_type:
-            raise TrackLoadError("There was an error while trying to load this track.")
-        
-        elif load_type == "empty":
+        # Tracks are rebuilt on every call, so cached results are bound to the new requester.
+        load_type, data = cached
+        if load_type == "empty":
             return None
 
-        elif load_type == "error":
-            raise TrackLoadError(f"{data['message']} [{data['severity']}]")
-
         elif load_type in ("playlist", "recommendations"):
             return Playlist(playlist_info=data["info"], tracks=data["tracks"], requester=requester)
 
@@ -399,7 +691,7 @@ class Node:
             return []
         
         tracks = await self.get_tracks(query=query, requester=self.bot.user)
-        if not track:
+        if not tracks:
             return []
         
         if isinstance(tracks, Playlist):
@@ -415,7 +707,7 @@ class Node:
         async with self._session.request(
             method="POST",
             url=uri,
-            headers={"Authorization": self._password},
+            headers=self._rest_headers,
             json={"refreshToken": token.token}
         ) as resp:
             if resp.status >= 300:
@@ -454,6 +746,9 @@ class NodePool:
          Use NodeAlgorithm.BY_PLAYERS if you want to get the best node
          based on how players it has. This method will return a node with
          the least amount of players
+         Use NodeAlgorithm.BY_LOAD if you want to get the best node
+         based on the penalty from its latest stats, so an overloaded
+         node with a high frame deficit stops receiving new players
         """
         available_nodes = [node for node in cls._nodes.values() if node._available]
 
@@ -468,6 +763,10 @@ class NodePool:
             tested_nodes = {node: len(node.players.keys()) for node in available_nodes}
             return min(tested_nodes, key=tested_nodes.get)
 
+        elif algorithm == NodeAlgorithm.BY_LOAD:
+            tested_nodes = {node: node.penalty for node in available_nodes}
+            return min(tested_nodes, key=tested_nodes.get)
+
     @classmethod
     def get_node(cls, *, identifier: str = None) -> Node:
         """Fetches a node from the node pool using it's identifier.
@@ -499,8 +798,11 @@ class NodePool:
         secure: bool = False,
         heartbeat: int = 30,
         yt_ratelimit: dict = None,
+        recovery: dict = None,
         session: Optional[aiohttp.ClientSession] = None,
+        http: dict = None,
         resume_key: Optional[str] = None,
+        resume_timeout: int = 60,
         logger: Optional[logging.Logger] = None
     ) -> Node:
         """Creates a Node object to be then added into the node pool.
@@ -514,7 +816,8 @@ class NodePool:
         node = Node(
             pool=cls, bot=bot, host=host, port=port, password=password,
             identifier=identifier, secure=secure, heartbeat=heartbeat, yt_ratelimit=yt_ratelimit,
-            session=session, resume_key=resume_key, logger=logger
+            recovery=recovery, http=http, session=session, resume_key=resume_key,
+            resume_timeout=resume_timeout, logger=logger
         )
 
         await node.connect()
@@ -21,14 +21,31 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+from __future__ import annotations
+
 from .exceptions import QueueFull, OutofList
 from .objects import Track
 from .enums import LoopType
-
-from typing import Optional, Tuple, Callable, Dict, List
+from .transformer import decode
+from .utils import DecodeCache
+
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import MutableSequence, Sequence
+from typing import Any, Iterable, Iterator, Optional, Tuple, Callable, Dict, List, Union
 from itertools import cycle
 from discord import Member
 
+# Sources whose blobs transformer.decode can fully parse, so their tracks can be stored as ids only.
+COMPACT_SOURCES = {
+    "youtube", "soundcloud", "bandcamp", "vimeo", "twitch", "http", "local",
+    "deezer", "spotify", "applemusic"
+}
+
+# Compact queues decode through their own cache, so queued tracks don't evict the shared DECODE_CACHE.
+QUEUE_DECODE_CACHE: DecodeCache = DecodeCache(maxsize=16384)
+
 class LoopTypeCycle:
     def __init__(self) -> None:
         self._cycle = cycle(LoopType)
@@ -58,17 +75,164 @@ class LoopTypeCycle:
     def __str__(self) -> str:
         return self.current.name.capitalize()
 
+class CompactTrackList(MutableSequence):
+    """A list of tracks which only keeps the encoded track id and an interned requester slot per entry.
+       Tracks are rebuilt from QUEUE_DECODE_CACHE when they are accessed. Tracks that carry
+       state which can't be recovered from their id (custom start or end time) are kept as is.
+
+       This trades CPU for memory: every access builds a new Track, and once the queued tracks
+       of all players outgrow QUEUE_DECODE_CACHE, reading a track parses its blob again. Controller
+       renders, the track selector and requester lookups by position all pay that cost.
+    """
+
+    __slots__ = ("_entries", "_slots", "_requesters", "_requester_slots")
+
+    def __init__(self, tracks: Iterable[Track] = ()) -> None:
+        self._entries: List[Union[str, Track]] = []
+        self._slots: array = array("I")
+        self._requesters: List[Optional[Member]] = []
+        self._requester_slots: Dict[Optional[Member], int] = {}
+
+        self.extend(tracks)
+
+    def __repr__(self) -> str:
+        return f"<Voicelink.CompactTrackList size={len(self)} requesters={len(self._requesters)}>"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Track, List[Track]]:
+        if isinstance(index, slice):
+            return [self._unpack(entry, slot) for entry, slot in zip(self._entries[index], self._slots[index])]
+        return self._unpack(self._entries[index], self._slots[index])
+
+    def __setitem__(self, index: Union[int, slice], value: Union[Track, Iterable[Track]]) -> None:
+        if isinstance(index, slice):
+            packed = [self._pack(track) for track in value]
+            self._entries[index] = [entry for entry, _ in packed]
+            self._slots[index] = array("I", [slot for _, slot in packed])
+        else:
+            self._entries[index], self._slots[index] = self._pack(value)
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        del self._entries[index]
+        del self._slots[index]
+
+        if not self._entries:
+            self._requesters.clear()
+            self._requester_slots.clear()
+
+    def __iter__(self) -> Iterator[Track]:
+        for entry, slot in zip(self._entries, self._slots):
+            yield self._unpack(entry, slot)
+
+    def insert(self, index: int, value: Track) -> None:
+        entry, slot = self._pack(value)
+        self._entries.insert(index, entry)
+        self._slots.insert(index, slot)
+
+    def track_id(self, index: int) -> str:
+        """Returns the encoded track id at the index without rebuilding the track."""
+        entry = self._entries[index]
+        return entry if isinstance(entry, str) else entry.track_id
+
+    def requester(self, index: int) -> Optional[Member]:
+        """Returns the requester at the index without rebuilding the track."""
+        return self._requesters[self._slots[index]]
+
+    def _intern(self, requester: Optional[Member]) -> int:
+        slot = self._requester_slots.get(requester)
+        if slot is None:
+            slot = self._requester_slots[requester] = len(self._requesters)
+            self._requesters.append(requester)
+        return slot
+
+    def _pack(self, track: Track) -> Tuple[Union[str, Track], int]:
+        slot = self._intern(track.requester)
+        if track.end_time is not None or track.position or track.source not in COMPACT_SOURCES:
+            return track, slot
+
+        track_id = track.track_id
+        QUEUE_DECODE_CACHE.put(track_id, track.info)
+        return track_id, slot
+
+    def _unpack(self, entry: Union[str, Track], slot: int) -> Track:
+        if isinstance(entry, Track):
+            return entry
+        return Track(track_id=entry, info=decode(entry, cache=QUEUE_DECODE_CACHE), requester=self._requesters[slot])
+
+class TrackView(Sequence):
+    """A read-only window over a range of the queue which doesn't copy the underlying tracks.
+       The range is fixed when the view is created and follows the list slicing semantics.
+    """
+
+    __slots__ = ("_tracks", "_range")
+
+    def __init__(self, tracks: MutableSequence[Track], start: Optional[int] = None, stop: Optional[int] = None) -> None:
+        self._tracks: MutableSequence[Track] = tracks
+        self._range: range = range(*slice(start, stop).indices(len(tracks)))
+
+    def __repr__(self) -> str:
+        return f"<Voicelink.TrackView size={len(self)}>"
+
+    def __len__(self) -> int:
+        return len(self._range)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Track, List[Track]]:
+        if isinstance(index, slice):
+            return [self._tracks[i] for i in self._range[index]]
+        return self._tracks[self._range[index]]
+
+    def __iter__(self) -> Iterator[Track]:
+        for i in self._range:
+            yield self._tracks[i]
+
+    def __reversed__(self) -> Iterator[Track]:
+        for i in reversed(self._range):
+            yield self._tracks[i]
+
 class Queue:
-    def __init__(self, size: int, allow_duplicate: bool, get_msg: Callable[[str], str]) -> None:
-        self._queue: List[Track] = []
+    def __init__(self, size: int, allow_duplicate: bool, get_msg: Callable[[str], str], compact: bool = False) -> None:
+        self._queue: MutableSequence[Track] = CompactTrackList() if compact else []
         self._position: int = 0
         self._size: int = size
         self._repeat: LoopTypeCycle = LoopTypeCycle()
         self._repeat_position: int = 0
         self._allow_duplicate: bool = allow_duplicate
 
+        # Multisets of the uris and (source, identifier) pairs of every track in the queue, history included.
+        self._uris: Counter[str] = Counter()
+        self._identifiers: Counter[Tuple[str, str]] = Counter()
+        # Bumped on every change to the stored tracks, so derived structures know when to rebuild.
+        self._version: int = 0
+
         self.get_msg = get_msg
 
+    def _index(self, tracks: Iterable[Track]) -> None:
+        self._version += 1
+        for track in tracks:
+            self._uris[track.uri] += 1
+            self._identifiers[(track.source, track.identifier)] += 1
+
+    def _unindex(self, tracks: Iterable[Track]) -> None:
+        self._version += 1
+        for track in tracks:
+            for counter, key in ((self._uris, track.uri), (self._identifiers, (track.source, track.identifier))):
+                if counter[key] > 1:
+                    counter[key] -= 1
+                else:
+                    counter.pop(key, None)
+
+    def is_duplicate(self, track: Track) -> bool:
+        """Returns whether the track, or another track with the same uri or identifier, is in the queue."""
+        return track.uri in self._uris or (track.source, track.identifier) in self._identifiers
+
+    def restore(self, tracks: Iterable[Track]) -> None:
+        """Appends tracks as they are, without the size limit or queue ordering. Used to restore a saved queue."""
+        for track in tracks:
+            self._queue.append(track)
+            self._index((track,))
+
     def get(self) -> Optional[Track]:
         track = None
         try:
@@ -90,6 +254,7 @@ class Queue:
             raise QueueFull(self.get_msg("voicelinkQueueFull").format(self._size))
 
         self._queue.append(item)
+        self._index((item,))
         return self.count
 
     def put_at_front(self, item: Track) -> int:
@@ -97,13 +262,15 @@ class Queue:
             raise QueueFull(self.get_msg("voicelinkQueueFull").format(self._size))
 
         self._queue.insert(self._position, item)
+        self._index((item,))
         return 1
 
     def put_at_index(self, index: int, item: Track) -> None:
         if self.count >= self._size:
             raise QueueFull(self.get_msg("voicelinkQueueFull").format(self._size))
 
-        return self._queue.insert(self._position - 1 + index, item)
+        self._queue.insert(self._position - 1 + index, item)
+        self._index((item,))
 
     def skipto(self, index: int) -> None:
         if not 0 < index <= self.count:
@@ -118,22 +285,29 @@ class Queue:
             self._position -= index
 
     def history_clear(self, is_playing: bool) -> None:
-        self._queue[:self._position - 1 if is_playing else self._position] = []
+        stop = self._position - 1 if is_playing else self._position
+        self._unindex(self._queue[:stop])
+        del self._queue[:stop]
         self._position = 1 if is_playing else 0
 
     def clear(self) -> None:
+        self._unindex(self._queue[self._position:])
         del self._queue[self._position:]
 
     def replace(self, queue_type: str, replacement: list) -> None:
         if queue_type == "queue":
             self.clear()
             self._queue += replacement
+            self._index(replacement)
         elif queue_type == "history":
+            self._unindex(self._queue[:self._position])
             self._queue[:self._position] = replacement
+            self._index(replacement)
 
     def swap(self, track_index1: int, track_index2: int) -> Tuple[Track, Track]:
         try:
             adjusted_position = self._position - 1
+            self._version += 1
             self._queue[adjusted_position + track_index1], self._queue[adjusted_position + track_index2] = self._queue[adjusted_position + track_index2], self._queue[adjusted_position + track_index1]
             return self._queue[adjusted_position + track_index1], self._queue[adjusted_position + track_index2]
         except IndexError:
@@ -144,8 +318,8 @@ class Queue:
             raise OutofList(self.get_msg("voicelinkOutofList"))
 
         try:
-            item = self._queue[self._position + target - 1]
-            self._queue.remove(item)
+            item = self._queue.pop(self._position + target - 1)
+            self._unindex((item,))
             self.put_at_index(to, item)
             return item
         except:
@@ -161,31 +335,42 @@ class Queue:
             index, index2 = index2, index
 
         try:
-            removed_tracks: Dict[str, Track] = {}
-            for i, track in enumerate(self._queue[pos + index: pos + index2 + 1]):
+            start, stop, _ = slice(pos + index, pos + index2 + 1).indices(len(self._queue))
+            removed_tracks: Dict[int, Track] = {}
+            kept_tracks: List[Track] = []
+            for i, track in enumerate(self._queue[start:stop], start=start):
                 if member and track.requester != member:
-                    continue
-            
-                self._queue.remove(track)
-                removed_tracks[pos + index + i] = track
+                    kept_tracks.append(track)
+                else:
+                    removed_tracks[i] = track
+
+            if removed_tracks:
+                self._queue[start:stop] = kept_tracks
+                self._unindex(removed_tracks.values())
 
             return removed_tracks
         except:
             raise OutofList(self.get_msg("voicelinkOutofList"))
 
-    def history(self, incTrack: bool = False) -> List[Track]:
+    def remove_by_requester(self, member: Member) -> Dict[int, Track]:
+        """Removes every upcoming track requested by the member in a single pass."""
+        if self.is_empty:
+            return {}
+        return self.remove(1, self.count, member)
+
+    def history(self, incTrack: bool = False) -> TrackView:
         if incTrack:
-            return self._queue[:self._position]
-        return self._queue[:self._position - 1]
+            return TrackView(self._queue, stop=self._position)
+        return TrackView(self._queue, stop=self._position - 1)
 
-    def tracks(self, incTrack: bool = False) -> List[Track]:
+    def tracks(self, incTrack: bool = False) -> TrackView:
         if incTrack:
-            return self._queue[self._position - 1:]
-        return self._queue[self._position:]
+            return TrackView(self._queue, start=self._position - 1)
+        return TrackView(self._queue, start=self._position)
 
     @property
     def count(self) -> int:
-        return len(self._queue[self._position:])
+        return max(len(self._queue) - self._position, 0)
     
     @property
     def repeat(self) -> str:
@@ -193,37 +378,170 @@ class Queue:
 
     @property
     def is_empty(self) -> bool:
-        try:
-            self._queue[self._position]
-        except:
-            return True
-        return False
+        return not self.count
 
-class FairQueue(Queue):
-    def __init__(self, size: int, allow_duplicate: bool, get_msg) -> None:
-        super().__init__(size, allow_duplicate, get_msg)
-        self._set = set()
+class FairRounds:
+    """Round-robin rounds of the upcoming tracks, used by FairQueue to place new tracks
+       without scanning the queue. A requester's n-th upcoming track always lives in
+       round n, and every round is ordered by the requester's rank, which is the order
+       the requesters entered the first round.
+    """
 
-    def put(self, item: Track) -> int:
-        if len(self._queue) >= self._size:
-            raise QueueFull(self.get_msg("voicelinkQueueFull").format(self._size))
+    __slots__ = ("_rounds", "_ranks", "_requesters", "_counts", "_next_rank")
+
+    def __init__(self) -> None:
+        self._rounds: List[List[int]] = []
+        self._ranks: Dict[Optional[Member], int] = {}
+        self._requesters: Dict[int, Optional[Member]] = {}
+        self._counts: Dict[Optional[Member], int] = {}
+        self._next_rank: int = 0
+
+    def __len__(self) -> int:
+        return sum(self._counts.values())
+
+    @classmethod
+    def from_requesters(cls, requesters: Iterable[Optional[Member]]) -> Optional[FairRounds]:
+        """Builds the rounds from the requesters of the upcoming tracks.
+           Returns None if the tracks are not in round-robin order, e.g. after they were moved by hand.
+        """
+        rounds = cls()
+        last_round = 0
+        for requester in requesters:
+            count = rounds._counts.get(requester, 0)
+            if count < last_round:
+                return None
+
+            rank = rounds._ranks.get(requester)
+            if rank is None:
+                rank = rounds._assign_rank(requester)
+
+            if count == len(rounds._rounds):
+                rounds._rounds.append([])
+            elif rounds._rounds[count][-1] > rank:
+                return None
+
+            rounds._rounds[count].append(rank)
+            rounds._counts[requester] = count + 1
+            last_round = count
+
+        return rounds
+
+    def _assign_rank(self, requester: Optional[Member]) -> int:
+        rank = self._ranks[requester] = self._next_rank
+        self._requesters[rank] = requester
+        self._next_rank += 1
+        return rank
+
+    def insert(self, requester: Optional[Member]) -> int:
+        """Adds a track for the requester and returns its index among the upcoming tracks."""
+        count = self._counts.get(requester, 0)
+        rank = self._ranks.get(requester)
+        if rank is None:
+            rank = self._assign_rank(requester)
+
+        if count == len(self._rounds):
+            self._rounds.append([])
+
+        bucket = self._rounds[count]
+        index = bisect_left(bucket, rank)
+        bucket.insert(index, rank)
+        self._counts[requester] = count + 1
+
+        return sum(map(len, self._rounds[:count])) + index
+
+    def pop_head(self) -> None:
+        """Removes the first upcoming track and rotates its requester to the back of every round."""
+        if not self._rounds:
+            return
+
+        rank = self._rounds[0].pop(0)
+        requester = self._requesters.pop(rank)
+        count = self._counts[requester] - 1
+
+        if count:
+            # The requester has the lowest rank, so it leads every round it is in.
+            new_rank = self._assign_rank(requester)
+            for index in range(1, count + 1):
+                self._rounds[index].pop(0)
+                self._rounds[index - 1].append(new_rank)
+            self._counts[requester] = count
+        else:
+            del self._ranks[requester], self._counts[requester]
+
+        while self._rounds and not self._rounds[-1]:
+            self._rounds.pop()
+
+        if self._rounds and not self._rounds[0]:
+            self._rounds.pop(0)
+
+class FairQueue(Queue):
+    def __init__(self, size: int, allow_duplicate: bool, get_msg, compact: bool = False) -> None:
+        super().__init__(size, allow_duplicate, get_msg, compact)
+        self._rounds: Optional[FairRounds] = None
+        self._rounds_base: int = 0
+        self._rounds_version: int = -1
 
-        tracks = self.tracks(incTrack=True)
+    @property
+    def _base(self) -> int:
+        # The current track takes part in the rounds, so the window starts one track before the position.
+        return max(self._position - 1, 0)
+
+    def _requesters(self, start: int) -> Iterator[Optional[Member]]:
+        if isinstance(self._queue, CompactTrackList):
+            return (self._queue.requester(index) for index in range(start, len(self._queue)))
+        return (track.requester for track in self._queue[start:])
+
+    def _sync_rounds(self) -> Optional[FairRounds]:
+        # A failed rebuild is kept as None too, so it is only retried once the queue changes.
+        if self._rounds_base != self._base or self._rounds_version != self._version:
+            self._rounds = FairRounds.from_requesters(self._requesters(self._base))
+            self._rounds_base = self._base
+            self._rounds_version = self._version
+        return self._rounds
+
+    def _scan_index(self, item: Track) -> int:
+        tracks = self._queue[self._base:]
         lastIndex = len(tracks)
         for track in reversed(tracks):
             if track.requester == item.requester:
                 break
             lastIndex -= 1
-        self._set.clear()
+
+        seen = set()
         for track in tracks[lastIndex:]:
-            if track.requester in self._set:
+            if track.requester in seen:
                 break
             lastIndex += 1
-            self._set.add(track.requester)
+            seen.add(track.requester)
 
-        self.put_at_index(lastIndex, item)
         return lastIndex
-    
+
+    def get(self) -> Optional[Track]:
+        base = self._base
+        track = super().get()
+
+        if self._rounds is not None:
+            if self._base == base + 1 and self._rounds_base == base:
+                self._rounds.pop_head()
+                self._rounds_base = self._base
+            elif self._base != base:
+                self._rounds = None
+
+        return track
+
+    def put(self, item: Track) -> int:
+        if len(self._queue) >= self._size:
+            raise QueueFull(self.get_msg("voicelinkQueueFull").format(self._size))
+
+        rounds = self._sync_rounds()
+        index = rounds.insert(item.requester) if rounds is not None else self._scan_index(item)
+        self._queue.insert(self._base + index, item)
+        self._index((item,))
+        self._rounds_version = self._version
+
+        # Without a current track the first upcoming track is at index 0 instead of 1.
+        return index if self._position else index + 1
+
 QUEUE_TYPES: Dict[str, Queue] = {
     "queue": Queue,
     "fairqueue": FairQueue
@@ -24,9 +24,10 @@ SOFTWARE.
 
 import struct
 
-from io import BytesIO
 from base64 import b64decode, b64encode
-from typing import Any, Callable, Dict, Mapping, Optional, Tuple, Final
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping, Optional, Tuple, Final
+
+from .utils import LRUCache, DecodeCache
 
 V2_KEYSET = {'title', 'author', 'length', 'identifier', 'isStream', 'uri', 'sourceName', 'position'}
 V3_KEYSET = V2_KEYSET | {'artworkUrl', 'isrc'}
@@ -39,19 +40,37 @@ class _MissingObj:
 
 MISSING: Any = _MissingObj()
 
+DECODE_CACHE: Final[DecodeCache] = DecodeCache()
+ENCODE_CACHE: Final[LRUCache] = LRUCache()
+
+_BYTE: Final[struct.Struct] = struct.Struct('B')
+_UNSIGNED_SHORT: Final[struct.Struct] = struct.Struct('>H')
+_INT: Final[struct.Struct] = struct.Struct('>i')
+_LONG: Final[struct.Struct] = struct.Struct('>Q')
+
 class DataReader:
-    __slots__ = ('_buf', '_mark')
+    __slots__ = ('_buf', '_pos', '_mark')
 
-    def __init__(self, base64_str: str):
-        self._buf: Final[BytesIO] = BytesIO(b64decode(base64_str))
+    def __init__(self, base64_str: Optional[str] = None):
+        self._buf: memoryview = memoryview(b'')
+        self._pos: int = 0
         self._mark: Optional[int] = None
 
+        if base64_str is not None:
+            self.feed(base64_str)
+
+    def feed(self, base64_str: str) -> None:
+        """Points the reader at a new track blob, so one reader can be reused across tracks."""
+        self._buf = memoryview(b64decode(base64_str))
+        self._pos = 0
+        self._mark = None
+
     @property
     def remaining(self) -> int:
-        return self._buf.getbuffer().nbytes - self._buf.tell()
+        return self._buf.nbytes - self._pos
 
     def mark(self) -> None:
-        self._mark = self._buf.tell()
+        self._mark = self._pos
 
     def rewind(self) -> None:
         if self._mark is None or not isinstance(self._mark, int):
@@ -60,30 +79,35 @@ class DataReader:
         if self._mark < 0:
             raise IOError('Cannot rewind buffer to a negative position!')
 
-        self._buf.seek(self._mark)
+        self._pos = self._mark
         self._mark = None
 
+    def _unpack(self, fmt: struct.Struct) -> Any:
+        result, = fmt.unpack_from(self._buf, self._pos)
+        self._pos += fmt.size
+        return result
+
     def _read(self, count: int) -> bytes:
-        return self._buf.read(count)
+        start = self._pos
+        self._pos += count
+        return self._buf[start:self._pos].tobytes()
 
     def read_byte(self) -> bytes:
         return self._read(1)
 
     def read_boolean(self) -> bool:
-        result, = struct.unpack('B', self.read_byte())
+        result = self._buf[self._pos]
+        self._pos += 1
         return result != 0
 
     def read_unsigned_short(self) -> int:
-        result, = struct.unpack('>H', self._read(2))
-        return result
+        return self._unpack(_UNSIGNED_SHORT)
 
     def read_int(self) -> int:
-        result, = struct.unpack('>i', self._read(4))
-        return result
+        return self._unpack(_INT)
 
     def read_long(self) -> int:
-        result, = struct.unpack('>Q', self._read(8))
-        return result
+        return self._unpack(_LONG)
 
     def read_nullable_utf(self, utfm: bool = False) -> Optional[str]:
         exists = self.read_boolean()
@@ -106,29 +130,26 @@ class DataWriter:
     __slots__ = ('_buf',)
 
     def __init__(self):
-        self._buf: Final[BytesIO] = BytesIO()
+        # The first 4 bytes are reserved for the message header, which is patched in by finish().
+        self._buf: Final[bytearray] = bytearray(_INT.size)
 
     def _write(self, data):
-        self._buf.write(data)
+        self._buf += data
 
     def write_byte(self, byte):
-        self._buf.write(byte)
+        self._buf += byte
 
     def write_boolean(self, boolean: bool):
-        enc = struct.pack('B', 1 if boolean else 0)
-        self.write_byte(enc)
+        self._buf.append(1 if boolean else 0)
 
     def write_unsigned_short(self, short: int):
-        enc = struct.pack('>H', short)
-        self._write(enc)
+        self._write(_UNSIGNED_SHORT.pack(short))
 
     def write_int(self, integer: int):
-        enc = struct.pack('>i', integer)
-        self._write(enc)
+        self._write(_INT.pack(integer))
 
     def write_long(self, long_value: int):
-        enc = struct.pack('>Q', long_value)
-        self._write(enc)
+        self._write(_LONG.pack(long_value))
 
     def write_nullable_utf(self, utf_string: Optional[str]):
         self.write_boolean(bool(utf_string))
@@ -146,19 +167,10 @@ class DataWriter:
         self.write_unsigned_short(byte_len)
         self._write(utf)
 
-    def finish(self) -> bytes:
-        with BytesIO() as track_buf:
-            byte_len = self._buf.getbuffer().nbytes
-            flags = byte_len | (1 << 30)
-            enc_flags = struct.pack('>i', flags)
-            track_buf.write(enc_flags)
-
-            self._buf.seek(0)
-            track_buf.write(self._buf.read())
-            self._buf.close()
-
-            track_buf.seek(0)
-            return track_buf.read()
+    def finish(self) -> bytearray:
+        byte_len = len(self._buf) - _INT.size
+        _INT.pack_into(self._buf, 0, byte_len | (1 << 30))
+        return self._buf
 
 def decode_probe_info(reader: DataReader) -> Mapping[str, Any]:
     probe_info = reader.read_utf().decode()
@@ -193,6 +205,21 @@ DEFAULT_DECODER_MAPPING: Dict[str, Callable[[DataReader], Mapping[str, Any]]] =
 }
 
 def read_utfm(utf_len: int, utf_bytes: bytes) -> str:
+    # Java's modified UTF-8 only differs from standard UTF-8 by encoding NUL as 0xC0 0x80
+    # and supplementary characters as surrogate triples, both of which a strict UTF-8
+    # decode rejects. Most titles contain neither, so try the C decoder first.
+    try:
+        return utf_bytes.decode('utf-8')
+    except UnicodeDecodeError:
+        pass
+
+    # Surrogate triples (emoji) can still be decoded natively and re-paired through UTF-16.
+    try:
+        return utf_bytes.decode('utf-8', 'surrogatepass').encode('utf-16', 'surrogatepass').decode('utf-16')
+    except UnicodeError:
+        return _read_utfm_slow(utf_len, utf_bytes)
+
+def _read_utfm_slow(utf_len: int, utf_bytes: bytes) -> str:
     chars = []
     count = 0
 
@@ -256,20 +283,17 @@ def _write_track_common(track: Dict[str, Any], writer: DataWriter):
     writer.write_boolean(track['isStream'])
     writer.write_nullable_utf(track['uri'])
 
-def decode(
-    track: str,
+def _resolve_decoders(
     source_decoders: Mapping[str, Callable[[DataReader], Mapping[str, Any]]] = MISSING
-) -> dict:
-
-    decoders = DEFAULT_DECODER_MAPPING.copy()
-
-    if source_decoders is not MISSING:
-        decoders.update(source_decoders)
+) -> Mapping[str, Callable[[DataReader], Mapping[str, Any]]]:
+    if source_decoders is MISSING:
+        return DEFAULT_DECODER_MAPPING
 
-    reader = DataReader(track)
+    return {**DEFAULT_DECODER_MAPPING, **source_decoders}
 
+def _decode_track(reader: DataReader, decoders: Mapping[str, Callable[[DataReader], Mapping[str, Any]]]) -> dict:
     flags = (reader.read_int() & 0xC0000000) >> 30
-    version, = struct.unpack('B', reader.read_byte()) if flags & 1 != 0 else (1,)
+    version = reader._unpack(_BYTE) if flags & 1 != 0 else 1
 
     title, author, length, identifier, is_stream, uri = _read_track_common(reader)
     extra_fields = {}
@@ -299,15 +323,67 @@ def decode(
         **extra_fields
     }
 
+def decode(
+    track: str,
+    source_decoders: Mapping[str, Callable[[DataReader], Mapping[str, Any]]] = MISSING,
+    *,
+    cache: DecodeCache = DECODE_CACHE
+) -> Mapping[str, Any]:
+    """Decodes an encoded track. Results for the default decoders are served from `cache`, DECODE_CACHE by default."""
+    if source_decoders is not MISSING:
+        return _decode_track(DataReader(track), _resolve_decoders(source_decoders))
+
+    info = cache.get(track)
+    if info is None:
+        info = cache.put(track, _decode_track(DataReader(track), DEFAULT_DECODER_MAPPING))
+
+    return info
+
+def decode_many(
+    tracks: Iterable[str],
+    source_decoders: Mapping[str, Callable[[DataReader], Mapping[str, Any]]] = MISSING
+) -> Iterator[Mapping[str, Any]]:
+    """Lazily decodes a batch of encoded tracks, reusing a single reader for the whole batch."""
+    decoders = _resolve_decoders(source_decoders)
+    reader = DataReader()
+    use_cache = source_decoders is MISSING
+
+    for track in tracks:
+        if use_cache and (info := DECODE_CACHE.get(track)) is not None:
+            yield info
+            continue
+
+        reader.feed(track)
+        info = _decode_track(reader, decoders)
+        yield DECODE_CACHE.put(track, info) if use_cache else info
+
+_ENCODE_KEYS: Final[Tuple[str, ...]] = (
+    'title', 'author', 'length', 'identifier', 'isStream', 'uri', 'artworkUrl', 'isrc', 'sourceName', 'position'
+)
+
 def encode(
     track: Dict[str, Any],
     source_encoders: Mapping[str, Callable[[DataWriter, Dict[str, Any]], None]] = MISSING
 ) -> str:
+    """Encodes track info. Results for the default encoders are served from ENCODE_CACHE."""
     assert V3_KEYSET <= track.keys()
 
+    if source_encoders is not MISSING:
+        return _encode_track(track, source_encoders)
+
+    key = tuple(track[field] for field in _ENCODE_KEYS)
+    encoded = ENCODE_CACHE.get(key)
+    if encoded is None:
+        encoded = ENCODE_CACHE.put(key, _encode_track(track, source_encoders))
+
+    return encoded
+
+def _encode_track(
+    track: Dict[str, Any],
+    source_encoders: Mapping[str, Callable[[DataWriter, Dict[str, Any]], None]] = MISSING
+) -> str:
     writer = DataWriter()
-    version = struct.pack('B', 3)
-    writer.write_byte(version)
+    writer.write_byte(_BYTE.pack(3))
     _write_track_common(track, writer)
     writer.write_nullable_utf(track['artworkUrl'])
     writer.write_nullable_utf(track['isrc'])
@@ -319,4 +395,4 @@ def encode(
     writer.write_long(track['position'])
 
     enc = writer.finish()
-    return b64encode(enc).decode()
\ No newline at end of file
+    return b64encode(enc).decode()
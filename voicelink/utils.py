@@ -21,13 +21,16 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import asyncio
 import random
 import time
 import socket
+from collections import OrderedDict
 from timeit import default_timer as timer
 from itertools import zip_longest
+from types import MappingProxyType
 
-from typing import Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping, Optional
 
 __all__ = [
     "ExponentialBackoff",
@@ -35,7 +38,12 @@ __all__ = [
     "NodeInfoVersion",
     "NodeInfo",
     "Plugin",
-    "Ping"
+    "Ping",
+    "TokenBucket",
+    "SingleFlight",
+    "LRUCache",
+    "DecodeCache",
+    "TTLCache"
 ]
 
 class ExponentialBackoff:
@@ -86,6 +94,198 @@ class ExponentialBackoff:
         return self._randfunc(0, self._base * 2 ** self._exp)
 
 
+class TokenBucket:
+    """A token bucket which allows `rate` acquisitions per second,
+       with bursts of up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("The rate of a token bucket must be greater than 0.")
+
+        self.rate: float = rate
+        self.capacity: int = max(capacity, 1)
+        self._tokens: float = float(self.capacity)
+        self._updated: float = time.monotonic()
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Waits until a token is available and takes it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+class SingleFlight:
+    """Coalesces concurrent calls which share a key, so they all await
+       the result of a single call instead of running it once each.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.calls: int = 0
+        self.coalesced: int = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._calls), "calls": self.calls, "coalesced": self.coalesced}
+
+    def _done(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+
+        # Retrieve the exception, so it isn't reported as never retrieved when every caller was cancelled.
+        if not future.cancelled():
+            future.exception()
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Awaits the in-flight call for the key, or starts it with func if there is none.
+           A cancelled caller does not cancel the call for the others.
+        """
+        if (future := self._calls.get(key)) is not None:
+            self.coalesced += 1
+        else:
+            self.calls += 1
+            future = asyncio.ensure_future(func())
+            self._calls[key] = future
+            future.add_done_callback(lambda f: self._done(key, f))
+
+        return await asyncio.shield(future)
+
+class LRUCache:
+    """A size-bounded least-recently-used cache with hit, miss and eviction counters."""
+    __slots__ = ('_entries', '_maxsize', 'hits', 'misses', 'evictions')
+
+    def __init__(self, maxsize: int = 4096):
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"<Voicelink.{type(self).__name__} size={len(self)} maxsize={self._maxsize} hits={self.hits} misses={self.misses}>"
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            'size': len(self),
+            'maxsize': self._maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hit_rate, 4)
+        }
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Returns the value of the key without counting the lookup or refreshing its recency."""
+        return self._entries.get(key)
+
+    def put(self, key: Hashable, value: Any) -> Any:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._evict()
+        return value
+
+    def resize(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._evict()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+class DecodeCache(LRUCache):
+    """An LRU cache which maps encoded track ids to their decoded info.
+       Cached results are read-only mappings, so they can be shared between callers.
+    """
+    __slots__ = ()
+
+    def put(self, track: str, info: Mapping[str, Any]) -> Mapping[str, Any]:
+        if not isinstance(info, MappingProxyType):
+            info = MappingProxyType(info)
+        return super().put(track, info)
+
+class TTLCache(LRUCache):
+    """An LRU cache whose entries also expire after a time-to-live in seconds.
+       A different ttl can be given per entry when it is put.
+    """
+    __slots__ = ('_ttl', 'expirations')
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 300.0):
+        super().__init__(maxsize)
+        self._ttl: float = ttl
+        self.expirations: int = 0
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {**super().stats, 'expirations': self.expirations}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> Any:
+        super().put(key, (time.monotonic() + (self._ttl if ttl is None else ttl), value))
+        return value
+
 class NodeStats:
     """The base class for the node stats object.
        Gives critical information on the node, which is updated every minute.
@@ -108,6 +308,23 @@ class NodeStats:
         self.players_total: int = data.get("players")
         self.uptime: int = data.get("uptime")
 
+        frames: Dict = data.get("frameStats") or {}
+        self.frames_sent: int = frames.get("sent", 0)
+        self.frames_nulled: int = frames.get("nulled", 0)
+        self.frames_deficit: int = frames.get("deficit", 0)
+
+    @property
+    def penalty(self) -> float:
+        """Property which returns the load penalty of the node, lower is better.
+           Frame stats are averaged per minute, where 3000 frames are expected per player.
+        """
+        cpu_penalty = (1.05 ** (100 * (self.cpu_system_load or 0)) * 10 - 10) \
+            + (1.05 ** (100 * (self.cpu_process_load or 0)) * 10 - 10)
+        deficit_penalty = 1.03 ** (500 * (max(self.frames_deficit, 0) / 3000)) * 600 - 600
+        nulled_penalty = (1.03 ** (500 * (max(self.frames_nulled, 0) / 3000)) * 300 - 300) * 2
+
+        return (self.players_active or 0) + cpu_penalty + deficit_penalty + nulled_penalty
+
     def __repr__(self) -> str:
         return f"<Voicelink.NodeStats total_players={self.players_total!r} playing_active={self.players_active!r}>"
 
@@ -203,4 +420,19 @@ class Ping:
             ((self._host, self._port), None))
         s_runtime = 1000 * (cost_time)
 
-        return s_runtime
\ No newline at end of file
+        return s_runtime
+
+    async def get_ping_async(self) -> float:
+        """Measures the TCP connect time without blocking the event loop.
+           A failed or timed out probe counts as the full timeout."""
+        self.timer.start()
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(self._host, int(self._port)), timeout=self._timeout
+            )
+        except (OSError, asyncio.TimeoutError):
+            return 1000 * self._timeout
+
+        self.timer.stop()
+        writer.close()
+        return 1000 * (self.timer._stop - self.timer._start)
\ No newline at end of file